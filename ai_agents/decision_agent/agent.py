@@ -1,7 +1,8 @@
-from agents import Agent, Runner
+from agents import Agent
 
 from ai_agents.decision_agent.prompt import build_prompt
 from ai_agents.decision_agent.schema import InvestmentDecisionOutput
+from ai_agents.runner import run_agent
 
 
 async def run_decision_agent(
@@ -27,6 +28,4 @@ async def run_decision_agent(
         output_type=InvestmentDecisionOutput,
     )
 
-    result = await Runner.run(agent, prompt)
-
-    return result.final_output
+    return await run_agent(agent, prompt)
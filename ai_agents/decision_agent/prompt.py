@@ -1,11 +1,4 @@
-def build_prompt(
-    ticker: str,
-    fundamental_analysis: str,
-    risk_analysis: str,
-    cash: float,
-    positions_summary: str,
-) -> list[dict[str, str]]:
-    system_prompt = """
+SYSTEM_PROMPT = """
 You are a portfolio-aware investment decision agent.
 
 Your role is to decide what ACTION to take for a specific stock
@@ -44,9 +37,31 @@ over aggressive actions.
 
 Your output must strictly follow the InvestmentDecisionOutput schema.
 """
-    user_prompt = f"""
-You are evaluating the following stock in the context of an existing portfolio.
 
+INSTRUCTIONS = """
+You are evaluating a stock in the context of an existing portfolio. The
+ticker, company analysis, risk assessment and portfolio state follow below.
+
+Based ONLY on that information:
+
+- Decide the most appropriate portfolio action for this stock
+- Explicitly consider whether the stock is already held
+- Explain how the current portfolio influenced your decision
+- Do NOT suggest position sizes or allocation percentages
+- Do NOT repeat the analysis verbatim
+
+Return a single InvestmentDecisionOutput.
+"""
+
+
+def build_prompt(
+    ticker: str,
+    fundamental_analysis: str,
+    risk_analysis: str,
+    cash: float,
+    positions_summary: str,
+) -> list[dict[str, str]]:
+    user_prompt = INSTRUCTIONS + f"""
 Ticker:
 {ticker}
 
@@ -60,23 +75,12 @@ Current portfolio state (summary):
 - Available cash: {cash}
 - Current positions:
 {positions_summary}
-
-Based ONLY on the information above:
-
-- Decide the most appropriate portfolio action for this stock
-- Explicitly consider whether the stock is already held
-- Explain how the current portfolio influenced your decision
-- Do NOT suggest position sizes or allocation percentages
-- Do NOT repeat the analysis verbatim
-
-Return a single InvestmentDecisionOutput.
-
 """
 
     return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": SYSTEM_PROMPT,
         },
         {
             "role": "user",
@@ -1,22 +1,37 @@
-from agents import Agent, Runner
+from agents import Agent
 
 from ai_agents.fundamental_scout.prompt import build_prompt
 from ai_agents.fundamental_scout.schema import FundamentalScoutOutput
+from ai_agents.runner import run_agent
 from ai_agents.tools.brave_search import (
     cached_get_company_overview,
     cached_get_latest_news,
 )
+from ai_agents.tools.search_archive import search_news_archive
 
 
-async def run_fundamental_scout(ticker: str, company_name: str):
-    prompt = build_prompt(ticker=ticker, company_name=company_name)
+async def run_fundamental_scout(
+    ticker: str,
+    company_name: str,
+    overview: str | None = None,
+    news: str | None = None,
+):
+    """
+    Analyze a company. When `overview` and `news` are given they go straight
+    into the prompt, and the search tools are only a fallback.
+    """
+    prompt = build_prompt(
+        ticker=ticker, company_name=company_name, overview=overview, news=news
+    )
     agent = Agent(
         name="Fundamental Scout",
         model="gpt-5-mini",
-        tools=[cached_get_company_overview, cached_get_latest_news],
+        tools=[
+            search_news_archive,
+            cached_get_company_overview,
+            cached_get_latest_news,
+        ],
         output_type=FundamentalScoutOutput,
     )
 
-    result = await Runner.run(agent, prompt)
-
-    return result.final_output
+    return await run_agent(agent, prompt)
@@ -1,10 +1,6 @@
 from datetime import datetime
 
-
-def build_prompt(ticker: str, company_name: str) -> list[dict[str, str]]:
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    system_prompt = """
+SYSTEM_PROMPT = """
 You are a fundamental scout.
 Your job is to analyze companies using fundamental information only.
 
@@ -19,6 +15,9 @@ You may request tools if you need:
 - company background information
 - recent news about the company
 
+Search the local news archive first, it is free and instant. Use the live
+search tools only when the archive has nothing recent enough.
+
 Your task:
 - Produce a concise fundamental thesis
 - List bull and bear cases
@@ -28,16 +27,42 @@ Your task:
 Be factual, natural, and explicit about uncertainties.
 """
 
-    user_prompt = f"""
-Today is {today}.
+RESEARCH_NOTE = """
+Search results already retrieved for you follow. Use the tools only if they
+are missing something you need.
+"""
 
+
+def build_prompt(
+    ticker: str,
+    company_name: str,
+    overview: str | None = None,
+    news: str | None = None,
+) -> list[dict[str, str]]:
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    # Static text first and the date last, so the shared prefix stays cacheable
+    user_prompt = f"""
 Analyze {company_name} [{ticker}] from a fundamental perspective.
+"""
+
+    if overview is not None or news is not None:
+        user_prompt += RESEARCH_NOTE + f"""
+Company overview:
+{overview or "[]"}
+
+Latest news:
+{news or "[]"}
+"""
+
+    user_prompt += f"""
+Today is {today}.
 """
 
     return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": SYSTEM_PROMPT,
         },
         {
             "role": "user",
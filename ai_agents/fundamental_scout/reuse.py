@@ -0,0 +1,75 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from ai_agents.tools.encoding import clean_text
+from persistence.analysis_repo import StoredAnalysis
+
+
+def news_fingerprint(*payloads: str) -> list[str]:
+    """
+    Signatures of the search results an analysis was based on.
+
+    Each result is reduced to its normalized title (or URL, or site), so the
+    same story re-fetched with a different snippet or rank keeps the same
+    signature.
+    """
+    signatures = set()
+    for payload in payloads:
+        try:
+            items = json.loads(payload)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if not isinstance(items, list):
+            continue
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            text = item.get("title") or item.get("url") or item.get("site") or ""
+            normalized = " ".join(re.findall(r"[a-z0-9]+", clean_text(text).lower()))
+            if normalized:
+                signatures.add(hashlib.sha1(normalized.encode()).hexdigest()[:16])
+
+    return sorted(signatures)
+
+
+def fingerprint_similarity(previous: list[str], current: list[str]) -> float:
+    """
+    Jaccard similarity of two fingerprints.
+    """
+    previous, current = set(previous), set(current)
+    if not previous and not current:
+        return 1.0
+    return len(previous & current) / len(previous | current)
+
+
+@dataclass(frozen=True)
+class ReusePolicy:
+    window: timedelta = timedelta(hours=24)
+    min_similarity: float = 0.8
+    max_value_change: float = 0.1
+
+    def reuse_fundamentals(
+        self, stored: StoredAnalysis | None, fingerprint: list[str]
+    ) -> bool:
+        """
+        Whether the stored analysis is recent and its news have not moved.
+        """
+        if stored is None:
+            return False
+        if datetime.now(timezone.utc) - stored.analyzed_at > self.window:
+            return False
+        similarity = fingerprint_similarity(stored.fingerprint, fingerprint)
+        return similarity >= self.min_similarity
+
+    def reuse_risk(self, stored: StoredAnalysis, portfolio_value: float) -> bool:
+        """
+        Whether the stored risk sizing still fits the current portfolio value.
+        """
+        if stored.portfolio_value <= 0:
+            return False
+        change = abs(portfolio_value - stored.portfolio_value) / stored.portfolio_value
+        return change <= self.max_value_change
@@ -1,10 +1,17 @@
+import asyncio
 from typing import List
 
-from agents import Agent, Runner
+import pandas as pd
+from agents import Agent
 
 from ai_agents.opportunity_scout.prompt import build_prompt
-from ai_agents.opportunity_scout.schema import OpportunityScoutOutput
+from ai_agents.opportunity_scout.schema import (
+    OpportunityCandidate,
+    OpportunityScoutOutput,
+)
+from ai_agents.runner import run_agent
 from ai_agents.tools.brave_search import cached_get_search_results
+from ai_agents.tools.search_archive import search_news_archive
 
 
 async def run_opportunity_scout(
@@ -13,6 +20,7 @@ async def run_opportunity_scout(
     portfolio_value: float,
     cash_available: float,
     max_candidates: int = 10,
+    ticker_signals: List[str] | None = None,
 ):
     prompt = build_prompt(
         ticker_list=ticker_list,
@@ -20,14 +28,98 @@ async def run_opportunity_scout(
         portfolio_value=portfolio_value,
         cash_avilable=cash_available,
         max_candidates=max_candidates,
+        ticker_signals=ticker_signals,
     )
     agent = Agent(
         name="Opportunity Scout",
         model="gpt-5-mini",
-        tools=[cached_get_search_results],
+        tools=[search_news_archive, cached_get_search_results],
         output_type=OpportunityScoutOutput,
     )
 
-    result = await Runner.run(agent, prompt)
+    return await run_agent(agent, prompt)
 
-    return result.final_output
+
+async def run_sharded_opportunity_scout(
+    universe: pd.DataFrame,
+    portfolio_tickers: List[str],
+    portfolio_value: float,
+    cash_available: float,
+    max_candidates: int = 10,
+    max_concurrency: int = 4,
+    ticker_signals: dict[str, str] | None = None,
+) -> OpportunityScoutOutput:
+    """
+    Run one scout per GICS sector concurrently and merge their shortlists.
+
+    `universe` needs `ticker` and `sector` columns. Shards that fail are
+    skipped; the merged candidates are re-ranked by priority and confidence
+    and cut to `max_candidates`.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    shards = [
+        (sector, shard["ticker"].tolist())
+        for sector, shard in universe.groupby("sector", sort=True)
+    ]
+
+    async def scout_shard(tickers: List[str]) -> OpportunityScoutOutput:
+        async with semaphore:
+            return await run_opportunity_scout(
+                ticker_list=tickers,
+                portfolio_tickers=portfolio_tickers,
+                portfolio_value=portfolio_value,
+                cash_available=cash_available,
+                max_candidates=max_candidates,
+                ticker_signals=(
+                    [ticker_signals[t] for t in tickers if t in ticker_signals]
+                    if ticker_signals
+                    else None
+                ),
+            )
+
+    results = await asyncio.gather(
+        *(scout_shard(tickers) for _, tickers in shards), return_exceptions=True
+    )
+
+    outputs = [
+        (sector, result)
+        for (sector, _), result in zip(shards, results)
+        if not isinstance(result, Exception)
+    ]
+    if not outputs:
+        raise results[0]
+
+    candidates = merge_candidates(
+        [result.candidates for _, result in outputs], max_candidates
+    )
+    summary = (
+        f"Sector-sharded scan of {len(outputs)}/{len(shards)} sectors. "
+        + " ".join(f"{sector}: {result.summary}" for sector, result in outputs)
+    )
+
+    return OpportunityScoutOutput(
+        universe_name="S&P 500 (sector-sharded)",
+        universe_size=len(universe),
+        selected_count=len(candidates),
+        candidates=candidates,
+        summary=summary[:800],
+    )
+
+
+def merge_candidates(
+    shortlists: List[List[OpportunityCandidate]], max_candidates: int
+) -> List[OpportunityCandidate]:
+    """
+    Merge shortlists keeping the best-ranked entry per ticker.
+
+    Ties keep the order of the shortlists, and of each shortlist, as given.
+    """
+    best: dict[str, OpportunityCandidate] = {}
+    for shortlist in shortlists:
+        for candidate in shortlist:
+            ticker = candidate.ticker.upper()
+            if ticker not in best or candidate.rank > best[ticker].rank:
+                best[ticker] = candidate
+
+    ranked = sorted(best.values(), key=lambda c: c.rank, reverse=True)
+    return ranked[:max_candidates]
@@ -1,17 +1,7 @@
 from datetime import datetime
 from typing import List
 
-
-def build_prompt(
-    ticker_list: List[str],
-    portfolio_tickers: List[str],
-    portfolio_value: float,
-    cash_avilable: float,
-    max_candidates: int = 10,
-) -> list[dict[str, str]]:
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    system_prompt = f"""
+SYSTEM_PROMPT = """
 You are an Opportunity Scout for a short-term aggressive equity strategy.
 
 Your task is to identify companies within a given universe that deserve deeper fundamental
@@ -25,7 +15,7 @@ Guidelines:
 to produce attention, volatility, or strategic importance in the short term.
 - Focus on recent and relevant information: earnings, regulatory updates, M&A, sector momentum,
 product launches, or market sentiment.
-- Limit the number of candidates to a maximum of {max_candidates} to avoid noise.
+- Limit the number of candidates to the maximum given in the request to avoid noise.
 - The portfolio has a finite size and can only support a limited number of
   meaningful positions.
 - Assume the portfolio should hold no more than 5–7 active positions in total
@@ -49,22 +39,22 @@ You will reeive:
 - Remaining cash available
 
 You have access to the following tools:
-1. cached_get_search_results(query: str, limit: int = 5) -> list[dict]:
+1. search_news_archive(query: str, ticker: str | None = None, max_age_days: int = 30) -> list[dict]:
+    - Searches results fetched in earlier sessions, stored locally. Free and instant.
+    - Try it first, and fall back to the live search when it has nothing recent enough.
+2. cached_get_search_results(query: str, limit: int = 5) -> list[dict]:
     - Use this tool to gather recent news and information about companies in the universe.
     - Focus on retrieving relevant and timely data that can inform your selection process.
     - Limit your queries to avoid excessive calls.
-    - Returns a list of search results with 'title', 'url', 'description', and 'page_age'.
+Both return a list of search results with 'title', 'site', 'date' and 'description'.
 """
-    user_prompt = f"""
-Universe: {len(ticker_list)} companies
-Company tickers in universe: {', '.join(ticker_list)}
-Existing holdings: {', '.join(portfolio_tickers) if portfolio_tickers else 'None'}
-Portfolio value: {portfolio_value}
-Available cash: {cash_avilable}
-Max candidates to select: {max_candidates}
 
+# Static instructions come before the universe and the per-call numbers so the
+# whole prefix can be served from the provider's prompt cache
+INSTRUCTIONS = """
 Instructions:
-- Identify the {max_candidates} companies most deserving of deeper analysis today {today}.
+- Identify the companies most deserving of deeper analysis today, up to the
+maximum number of candidates given at the end.
 - For each selected company, explain why it deserves attention now (“why_now”), list 1–5 key
 catalysts, assign priority and confidence.
 - Summarize the selection in a short overview.
@@ -74,10 +64,44 @@ You may deprioritize them if conviction is lower.
 Output format: strictly follow the OpportunityScoutOutput schema.
 """
 
+
+def build_prompt(
+    ticker_list: List[str],
+    portfolio_tickers: List[str],
+    portfolio_value: float,
+    cash_avilable: float,
+    max_candidates: int = 10,
+    ticker_signals: List[str] | None = None,
+) -> list[dict[str, str]]:
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    # Sorted by ticker so the same universe always renders the same text
+    if ticker_signals:
+        universe_section = (
+            "Pre-screened tickers with their local signals (20-day momentum, "
+            "annualized volatility, volume z-score, opening gap, recent news count):\n"
+            + "\n".join(f"- {line}" for line in sorted(ticker_signals))
+        )
+    else:
+        universe_section = (
+            f"Company tickers in universe: {', '.join(sorted(ticker_list))}"
+        )
+
+    user_prompt = INSTRUCTIONS + f"""
+Universe: {len(ticker_list)} companies
+{universe_section}
+
+Existing holdings: {', '.join(sorted(portfolio_tickers)) if portfolio_tickers else 'None'}
+Portfolio value: {portfolio_value}
+Available cash: {cash_avilable}
+Max candidates to select: {max_candidates}
+Today is {today}.
+"""
+
     return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": SYSTEM_PROMPT,
         },
         {
             "role": "user",
@@ -2,6 +2,8 @@ from typing import List, Literal
 
 from pydantic import BaseModel, Field
 
+LEVEL_RANK = {"low": 0, "medium": 1, "high": 2}
+
 
 class OpportunityCandidate(BaseModel):
     ticker: str = Field(..., description="The stock ticker symbol.")
@@ -25,6 +27,13 @@ class OpportunityCandidate(BaseModel):
         ..., description="Confidence in the signal, not in the investment outcome."
     )
 
+    @property
+    def rank(self) -> tuple[int, int]:
+        """
+        Sort key, higher is better: priority first, then confidence.
+        """
+        return (LEVEL_RANK[self.priority], LEVEL_RANK[self.confidence])
+
 
 class OpportunityScoutOutput(BaseModel):
     universe_name: str = Field(
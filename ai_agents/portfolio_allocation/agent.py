@@ -1,6 +1,6 @@
 from typing import List
 
-from agents import Agent, Runner
+from agents import Agent
 
 from ai_agents.decision_agent.schema import InvestmentDecisionOutput
 from ai_agents.portfolio_allocation.prompt import build_prompt
@@ -9,6 +9,7 @@ from ai_agents.portfolio_allocation.schema import (
     PortfolioConstraints,
 )
 from ai_agents.risk_analyst.schema import RiskProfile
+from ai_agents.runner import run_agent
 
 
 async def run_portfolio_allocation(
@@ -40,6 +41,4 @@ async def run_portfolio_allocation(
         output_type=PortfolioAllocation,
     )
 
-    result = await Runner.run(agent, prompt)
-
-    return result.final_output
+    return await run_agent(agent, prompt)
@@ -1,15 +1,6 @@
 from ai_agents.portfolio_allocation.schema import PortfolioConstraints
 
-
-def build_prompt(
-    constraints: PortfolioConstraints,
-    total_portfolio_value: float,
-    current_positions: list[str],
-    available_cash: float,
-    risk_analysis,
-    investment_decisions,
-) -> list[dict[str, str]]:
-    system_prompt = """
+SYSTEM_PROMPT = """
 You are a portfolio allocation agent managing capital for an active equity portfolio.
 
 Your role is to convert multiple independent investment evaluations into a single,
@@ -91,17 +82,36 @@ Think in terms of portfolio efficiency, not just opportunity availability.
 Your output must strictly follow the PortfolioAllocation schema.
 """
 
-    user_prompt = f"""
-You are given the following inputs for portfolio construction:
+INSTRUCTIONS = """
+You are given the portfolio constraints, the portfolio state and the
+investment inputs below.
+
+Using ONLY that information:
+
+- Construct a single PortfolioAllocation plan
+- Select positions that best fit the portfolio constraints
+- Allocate capital conservatively within risk limits
+- Keep sufficient cash if suitable opportunities are limited
+- Identify key portfolio-level risks or concentrations
+
+Output must strictly conform to the PortfolioAllocation schema.
+"""
+
 
+def build_prompt(
+    constraints: PortfolioConstraints,
+    total_portfolio_value: float,
+    current_positions: list[str],
+    available_cash: float,
+    risk_analysis,
+    investment_decisions,
+) -> list[dict[str, str]]:
+    user_prompt = INSTRUCTIONS + f"""
 Portfolio constraints:
 - Maximum number of positions: {constraints.max_positions}
 - Maximum allocation per position: {constraints.max_position_pct}%
 - Target cash buffer: {constraints.min_cash_pct}% minimum
 - Minimum meaningful position size: 700 EUR
-- Total portfolio value: {total_portfolio_value} EUR
-- Current positions: {','.join(current_positions)}
-- Available cash: {available_cash} EUR
 - Strategy profile: short-term aggressive
 
 Investment inputs:
@@ -112,21 +122,15 @@ InvestmentDecisions:
 RiskAnalysis:
 {risk_analysis}
 
-Using ONLY the information above:
-
-- Construct a single PortfolioAllocation plan
-- Select positions that best fit the portfolio constraints
-- Allocate capital conservatively within risk limits
-- Keep sufficient cash if suitable opportunities are limited
-- Identify key portfolio-level risks or concentrations
-
-Output must strictly conform to the PortfolioAllocation schema.
-
+Portfolio state:
+- Total portfolio value: {total_portfolio_value} EUR
+- Current positions: {','.join(current_positions)}
+- Available cash: {available_cash} EUR
 """
     return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": SYSTEM_PROMPT,
         },
         {
             "role": "user",
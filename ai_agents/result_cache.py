@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import time
+
+from agents import Agent
+from pydantic import BaseModel
+
+from persistence.database import get_connection
+
+CACHE_MODES = ("off", "read_write", "replay")
+
+
+class AgentReplayMissError(RuntimeError):
+    """Raised in replay mode when no recorded output matches an agent call."""
+
+
+class AgentResultCache:
+    """
+    Content-addressed cache of validated agent outputs.
+
+    Modes:
+    - off: always run the agent
+    - read_write: serve fresh recorded outputs, record new ones
+    - replay: only serve recorded outputs (ignoring TTL), never call the LLM
+    """
+
+    def __init__(self, mode: str = "off", ttl: float = 24 * 3600, max_entries=2000):
+        if mode not in CACHE_MODES:
+            raise ValueError(
+                f"Unknown agent cache mode {mode}, use one of {CACHE_MODES}"
+            )
+
+        self.mode = mode
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def fingerprint(agent: Agent, prompt) -> str:
+        """
+        Hash everything that determines an agent's output before it runs.
+
+        Tool results are not known until the agent calls them, so the key covers
+        the tool definitions available to it instead.
+        """
+        output_type = agent.output_type
+        payload = {
+            "agent": agent.name,
+            "model": str(agent.model),
+            "prompt": prompt,
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": getattr(tool, "description", None),
+                    "params": getattr(tool, "params_json_schema", None),
+                }
+                for tool in agent.tools
+            ],
+            "output_schema": (
+                output_type.model_json_schema()
+                if isinstance(output_type, type) and issubclass(output_type, BaseModel)
+                else str(output_type)
+            ),
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, key: str, output_type: type[BaseModel]) -> BaseModel | None:
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT output, created_at FROM agent_results WHERE cache_key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None or (
+            self.mode != "replay" and time.time() - row["created_at"] > self.ttl
+        ):
+            conn.close()
+            return None
+
+        conn.execute(
+            "UPDATE agent_results SET last_used_at = ? WHERE cache_key = ?",
+            (time.time(), key),
+        )
+        conn.commit()
+        conn.close()
+        return output_type.model_validate_json(row["output"])
+
+    def put(self, key: str, agent: Agent, output: BaseModel):
+        now = time.time()
+        conn = get_connection()
+        conn.execute(
+            """
+            INSERT INTO agent_results
+            (cache_key, agent, model, output, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                output = excluded.output,
+                created_at = excluded.created_at,
+                last_used_at = excluded.last_used_at
+            """,
+            (key, agent.name, str(agent.model), output.model_dump_json(), now, now),
+        )
+
+        # Evict expired entries, then the least recently used over the cap
+        conn.execute(
+            "DELETE FROM agent_results WHERE created_at < ?", (now - self.ttl,)
+        )
+        conn.execute(
+            """
+            DELETE FROM agent_results WHERE cache_key NOT IN (
+                SELECT cache_key FROM agent_results
+                ORDER BY last_used_at DESC LIMIT ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        conn.commit()
+        conn.close()
+
+
+agent_result_cache = AgentResultCache(
+    mode=os.getenv("AGENT_CACHE_MODE", "off"),
+    ttl=float(os.getenv("AGENT_CACHE_TTL", str(24 * 3600))),
+    max_entries=int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "2000")),
+)
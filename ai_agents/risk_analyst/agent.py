@@ -1,7 +1,8 @@
-from agents import Agent, Runner
+from agents import Agent
 
 from ai_agents.risk_analyst.prompt import build_prompt
 from ai_agents.risk_analyst.schema import RiskProfile
+from ai_agents.runner import run_agent
 
 
 async def run_risk_analyst(
@@ -18,6 +19,4 @@ async def run_risk_analyst(
         output_type=RiskProfile,
     )
 
-    result = await Runner.run(agent, prompt)
-
-    return result.final_output
+    return await run_agent(agent, prompt)
@@ -1,5 +1,4 @@
-def build_prompt(fundamental_analysis, portfolio_value) -> list[dict[str, str]]:
-    system_prompt = """
+SYSTEM_PROMPT = """
 You are a professional risk analyst managing capital for an active equity portfolio.
 
 Your goal is to protect capital first and enable asymmetric returns second.
@@ -43,11 +42,12 @@ Sizing objective:
 
 Your output must be structured, concrete, and practical.
 """
-    user_prompt = f"""
+
+INSTRUCTIONS = """
 You are given the following inputs:
 
 1. FundamentalAnalysis
-2. Total portfolio value: {portfolio_value} EUR
+2. Total portfolio value in EUR
 
 Using ONLY this information, produce a RiskProfile for this investment.
 
@@ -57,15 +57,21 @@ Consider:
 - Downside asymmetry
 - Uncertainty and information gaps
 - Short-term volatility
+"""
 
+
+def build_prompt(fundamental_analysis, portfolio_value) -> list[dict[str, str]]:
+    user_prompt = INSTRUCTIONS + f"""
 FundamentalAnalysis:
 {fundamental_analysis}
+
+Total portfolio value: {portfolio_value} EUR
 """
 
     return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": SYSTEM_PROMPT,
         },
         {
             "role": "user",
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+
+import openai
+from agents import Agent, Runner, ToolCallItem
+
+from ai_agents.result_cache import AgentReplayMissError, agent_result_cache
+from concurrency.adaptive_limiter import AdaptiveConfig, AdaptiveLimiter
+from observability.metrics import RATIO_BUCKETS, metrics
+
+
+def _is_overload(error: BaseException) -> bool:
+    return isinstance(
+        error, (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError)
+    )
+
+
+def _retry_after(error: BaseException) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Bounds every agent run in the process against the model provider
+agent_limiter = AdaptiveLimiter(
+    "openai",
+    is_overload=_is_overload,
+    retry_after=_retry_after,
+    config=AdaptiveConfig(
+        initial_limit=int(os.getenv("AGENT_CONCURRENCY_INITIAL", "2")),
+        max_limit=int(os.getenv("AGENT_CONCURRENCY_MAX", "16")),
+        max_retries=int(os.getenv("AGENT_MAX_RETRIES", "3")),
+    ),
+)
+
+
+async def run_agent(agent: Agent, prompt):
+    """
+    Run an agent and return its final output, going through the result cache.
+    """
+    cache = agent_result_cache
+    started = time.perf_counter()
+    if not cache.enabled:
+        result = await _run(agent, prompt)
+        _record_run(agent, result, started)
+        return result.final_output
+
+    key = cache.fingerprint(agent, prompt)
+    cached = cache.get(key, agent.output_type)
+    if cached is not None:
+        _record_run(agent, None, started)
+        return cached
+    if cache.mode == "replay":
+        raise AgentReplayMissError(f"No recorded output for {agent.name} ({key[:12]})")
+
+    result = await _run(agent, prompt)
+    _record_run(agent, result, started)
+    cache.put(key, agent, result.final_output)
+    return result.final_output
+
+
+async def _run(agent: Agent, prompt):
+    return await agent_limiter.run(lambda: Runner.run(agent, prompt), key=agent.name)
+
+
+def _record_run(agent: Agent, result, started: float):
+    """
+    Wall time, token usage and tool calls of one run. `result` is None when
+    the output came from the result cache.
+    """
+    source = "cache" if result is None else "llm"
+    metrics.observe(
+        "agent_run_duration_seconds",
+        time.perf_counter() - started,
+        agent=agent.name,
+        source=source,
+    )
+    metrics.inc("agent_runs_total", agent=agent.name, source=source)
+    if result is None:
+        return
+
+    usage = result.context_wrapper.usage
+    metrics.inc("agent_llm_requests_total", usage.requests, agent=agent.name)
+    metrics.inc(
+        "agent_tokens_total", usage.input_tokens, agent=agent.name, kind="input"
+    )
+    metrics.inc(
+        "agent_tokens_total", usage.output_tokens, agent=agent.name, kind="output"
+    )
+    metrics.inc(
+        "agent_tokens_total",
+        usage.input_tokens_details.cached_tokens,
+        agent=agent.name,
+        kind="cached_input",
+    )
+    # Share of each request's prompt served from the provider's prompt cache
+    for request in usage.request_usage_entries:
+        if request.input_tokens:
+            metrics.observe(
+                "agent_cached_prompt_ratio",
+                request.input_tokens_details.cached_tokens / request.input_tokens,
+                buckets=RATIO_BUCKETS,
+                agent=agent.name,
+            )
+    tool_calls = sum(isinstance(item, ToolCallItem) for item in result.new_items)
+    metrics.inc("agent_tool_calls_total", tool_calls, agent=agent.name)
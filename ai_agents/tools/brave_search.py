@@ -1,15 +1,33 @@
-import json
+import asyncio
 import os
 
-import httpx
 from agents import function_tool
 
-from ai_agents.tools.cache import cached_function_tool
+from ai_agents.tools.cache import cached_function_tool, tool_cache
+from ai_agents.tools.dedupe import NearDuplicateFilter
+from ai_agents.tools.encoding import ResultEncoding, encode_results
+from ai_agents.tools.http_client import get_http_client
 from ai_agents.tools.rate_limiter import brave_limiter
+from ai_agents.tools.search_archive import archive_results
+from concurrency.resilience import provider_resilience
+from observability.metrics import metrics
+
+# With SEARCH_DEDUPE_SCOPE=session every search shares one index, so a story
+# already returned for one ticker is dropped from later searches. Cached tool
+# results keep whatever was dropped, so this suits short cache TTLs best.
+SEARCH_DEDUPE_SCOPE = os.getenv("SEARCH_DEDUPE_SCOPE", "query")
+session_dedupe = NearDuplicateFilter(
+    threshold=float(os.getenv("SEARCH_DEDUPE_THRESHOLD", "0.5"))
+)
 
 
 async def brave_search(
-    query: str, limit: int = 5, result_filter: list[str] = None
+    query: str,
+    limit: int = 5,
+    result_filter: list[str] = None,
+    dedupe: NearDuplicateFilter | None = None,
+    company: str | None = None,
+    ticker: str | None = None,
 ) -> list[dict]:
     """
     Perform a Brave Search query and return top results.
@@ -17,16 +35,18 @@ async def brave_search(
     Args:
         query (str): Search query string
         limit (int): Number of results to return
+        dedupe (NearDuplicateFilter): Filter collapsing near duplicate results,
+            defaults to one per query or the session filter
+        company (str), ticker (str): Tags of the results in the search archive
 
     Returns:
-        List of dicts with 'title', 'url', 'descrition', 'page_age'
+        List of dicts with 'title', 'url', 'descrition', 'page_age', and
+        'similar' when near duplicates were collapsed into a result
     """
     BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
     BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
 
     HEADERS = {
-        "Accept": "application/json",
-        "Accept-Encoding": "gzip",
         "x-subscription-token": BRAVE_API_KEY,
     }
 
@@ -39,15 +59,17 @@ async def brave_search(
         "result_filter": ",".join(result_filter),
     }
 
-    await brave_limiter.acquire()
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(
+    async def attempt():
+        await brave_limiter.acquire()
+        response = await get_http_client().get(
             BRAVE_SEARCH_URL,
             headers=HEADERS,
             params=params,
         )
-    response.raise_for_status()
-    data = response.json()
+        response.raise_for_status()
+        return response.json()
+
+    data = await provider_resilience("brave_search").call(attempt)
 
     results = []
 
@@ -62,7 +84,40 @@ async def brave_search(
                     "page_age": item.get("page_age"),
                 }
             )
-    return results
+
+    await archive_results(results, query, company=company, ticker=ticker)
+
+    if dedupe is None:
+        dedupe = (
+            session_dedupe
+            if SEARCH_DEDUPE_SCOPE == "session"
+            else NearDuplicateFilter(threshold=session_dedupe.threshold)
+        )
+    unique = dedupe.filter(results)
+    metrics.inc("search_results_total", len(results))
+    metrics.inc("search_results_collapsed_total", len(results) - len(unique))
+    return unique
+
+
+# Per-tool rendering of results: overviews keep longer descriptions, news
+# keeps more results per outlet, free-form searches stay short
+COMPANY_OVERVIEW_ENCODING = ResultEncoding(description_chars=400, max_per_domain=1)
+LATEST_NEWS_ENCODING = ResultEncoding(description_chars=200, max_per_domain=3)
+SEARCH_RESULTS_ENCODING = ResultEncoding(description_chars=160, max_per_domain=2)
+
+
+async def company_overview(company_name: str, ticker: str | None = None) -> str:
+    query = f"{company_name} company overview financials business model"
+    results = await brave_search(query, limit=3, company=company_name, ticker=ticker)
+
+    return encode_results(results, COMPANY_OVERVIEW_ENCODING)
+
+
+async def latest_news(company_name: str, ticker: str | None = None) -> str:
+    query = f"{company_name} latest news"
+    results = await brave_search(query, limit=10, company=company_name, ticker=ticker)
+
+    return encode_results(results, LATEST_NEWS_ENCODING)
 
 
 @function_tool
@@ -70,10 +125,7 @@ async def get_company_overview(company_name: str) -> str:
     """
     Get a short company overview from Brave Search results.
     """
-    query = f"{company_name} company overview financials business model"
-    results = await brave_search(query, limit=3)
-
-    return json.dumps(results, indent=2)
+    return await company_overview(company_name)
 
 
 @function_tool
@@ -81,10 +133,7 @@ async def get_latest_news(company_name: str) -> str:
     """
     Get recent news headlines about the company.
     """
-    query = f"{company_name} latest news"
-    results = await brave_search(query, limit=10)
-
-    return json.dumps(results, indent=2)
+    return await latest_news(company_name)
 
 
 @function_tool
@@ -94,15 +143,60 @@ async def get_seach_results(query: str, limit: int = 20) -> str:
     """
     results = await brave_search(query, limit=limit)
 
-    return json.dumps(results, indent=2)
+    return encode_results(results, SEARCH_RESULTS_ENCODING)
+
 
+COMPANY_OVERVIEW_TTL = 12 * 3600  # Cache for 12 hours
+LATEST_NEWS_TTL = 1 * 3600  # Cache for 1 hour
+SEARCH_RESULTS_TTL = 6 * 3600  # Cache for 6 hours
 
 cached_get_company_overview = cached_function_tool(
-    tool=get_company_overview, ttl=12 * 3600
-)  # Cache for 12 hours
-cached_get_latest_news = cached_function_tool(
-    tool=get_latest_news, ttl=1 * 3600
-)  # Cache for 1 hour
+    tool=get_company_overview, ttl=COMPANY_OVERVIEW_TTL
+)
+cached_get_latest_news = cached_function_tool(tool=get_latest_news, ttl=LATEST_NEWS_TTL)
 cached_get_search_results = cached_function_tool(
-    tool=get_seach_results, ttl=6 * 3600
-)  # Cache for 6 hours
+    tool=get_seach_results, ttl=SEARCH_RESULTS_TTL
+)
+
+
+async def fetch_company_overview(company_name: str, ticker: str | None = None) -> str:
+    """
+    Company overview, sharing the cache entry of the agent tool. `ticker`
+    only tags the results in the search archive.
+    """
+    return await tool_cache.get_or_call(
+        namespace=get_company_overview.name,
+        arguments={"company_name": company_name},
+        ttl=COMPANY_OVERVIEW_TTL,
+        call=lambda: company_overview(company_name, ticker=ticker),
+    )
+
+
+async def fetch_latest_news(company_name: str, ticker: str | None = None) -> str:
+    """
+    Latest company news, sharing the cache entry of the agent tool. `ticker`
+    only tags the results in the search archive.
+    """
+    return await tool_cache.get_or_call(
+        namespace=get_latest_news.name,
+        arguments={"company_name": company_name},
+        ttl=LATEST_NEWS_TTL,
+        call=lambda: latest_news(company_name, ticker=ticker),
+    )
+
+
+async def prefetch_company_research(companies: list[tuple[str, str]]):
+    """
+    Fetch the overview and news of every (company name, ticker) concurrently
+    into the tool cache. Later fetches of the same company join the request
+    in flight or hit the cache. Failures are left for those later fetches to
+    report.
+    """
+    await asyncio.gather(
+        *(
+            fetch(company_name, ticker=ticker)
+            for company_name, ticker in companies
+            for fetch in (fetch_company_overview, fetch_latest_news)
+        ),
+        return_exceptions=True,
+    )
@@ -1,50 +1,202 @@
+import asyncio
 import json
+import os
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
 
 import diskcache
 from agents import FunctionTool
 
+from concurrency.single_flight import SingleFlight
+from observability.metrics import metrics
 
-def cached_function_tool(tool, ttl: int):
+TOOL_CACHE_PATH = "./function_tool_cache"
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    memory_hits: int = 0
+    misses: int = 0
+    lookup_time: float = 0.0
+    call_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ToolCache:
     """
-    Wrap a FunctionTool (or async function) and cache its results for TTL seconds.
+    Shared cache for function tool results.
+
+    Every tool gets its own namespace inside one diskcache store, which handles
+    expiry and size-bounded eviction natively. A small in-memory LRU sits in
+    front of it and disk reads and writes run in a worker thread, so lookups
+    never block the event loop. Concurrent misses for the same key share one
+    tool invocation.
     """
-    original_on_invoke = tool.on_invoke_tool
 
-    _cache = diskcache.Cache("./function_tool_cache")
+    def __init__(
+        self,
+        path: str = TOOL_CACHE_PATH,
+        size_limit: int = 256 * 1024 * 1024,
+        memory_entries: int = 256,
+    ):
+        self.path = path
+        self.size_limit = size_limit
+        self.memory_entries = memory_entries
+        self._disk: diskcache.Cache | None = None
+        self._memory: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._flight = SingleFlight()
+        self._stats: dict[str, ToolCacheStats] = {}
 
-    async def cached_on_invoke(tool_context, tool_arguments):
-        # Normalize tool_arguments into a hashable key
-        if isinstance(tool_arguments, dict):
-            # Multiple named arguments
-            args_key = tuple(sorted(tool_arguments.items()))
-        elif isinstance(tool_arguments, str):
+    async def get_or_call(
+        self,
+        namespace: str,
+        arguments,
+        ttl: float,
+        call: Callable[[], Awaitable[Any]],
+    ):
+        key = self.key(namespace, arguments)
+        stats = self._stats.setdefault(namespace, ToolCacheStats())
+
+        started = time.perf_counter()
+        value = self._get_memory(key)
+        if value is not None:
+            stats.memory_hits += 1
+        else:
+            value = self._promote(key, await asyncio.to_thread(self._get_disk, key))
+        stats.lookup_time += time.perf_counter() - started
+
+        if value is not None:
+            stats.hits += 1
+            self._record(namespace, "hit", started)
+            return value
+        stats.misses += 1
+
+        async def invoke():
+            started = time.perf_counter()
+            result = await call()
+            stats.call_time += time.perf_counter() - started
+            await self.set(namespace, arguments, result, ttl)
+            return result
+
+        # Concurrent misses for the same key share a single invocation
+        result = await self._flight.do(key, invoke)
+        self._record(namespace, "miss", started)
+        return result
+
+    async def set(self, namespace: str, arguments, value, ttl: float):
+        key = self.key(namespace, arguments)
+        self._set_memory(key, value, time.time() + ttl)
+        await asyncio.to_thread(self._set_disk, key, value, ttl, namespace)
+
+    async def peek_many(self, namespace: str, arguments_list: list) -> list:
+        """
+        Look up cached results without invoking the tool. Misses are None.
+        Memory misses are read from disk in one batch off the event loop.
+        """
+        keys = [self.key(namespace, arguments) for arguments in arguments_list]
+        results = [self._get_memory(key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            entries = await asyncio.to_thread(
+                lambda: [self._get_disk(keys[i]) for i in missing]
+            )
+            for i, entry in zip(missing, entries):
+                results[i] = self._promote(keys[i], entry)
+        return results
+
+    def stats(self) -> dict[str, ToolCacheStats]:
+        return dict(self._stats)
+
+    def coalesced(self) -> int:
+        return self._flight.stats().coalesced
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    @staticmethod
+    def key(namespace: str, arguments) -> str:
+        # Normalize tool arguments into a stable string key
+        if isinstance(arguments, str):
             try:
-                parsed = json.loads(tool_arguments)
-                if isinstance(parsed, dict):
-                    args_key = tuple(sorted(parsed.items()))
-                else:
-                    args_key = (tool_arguments,)
+                arguments = json.loads(arguments)
             except json.JSONDecodeError:
-                args_key = (tool_arguments,)
-        else:
-            # Single argument (string, int, etc.)
-            args_key = (tool_arguments,)
+                pass
+        return f"{namespace}:{json.dumps(arguments, sort_keys=True, default=str)}"
 
-        key = (tool.name, args_key)
-        now = time.time()
+    def _record(self, namespace: str, cache: str, started: float):
+        metrics.observe(
+            "tool_call_duration_seconds",
+            time.perf_counter() - started,
+            tool=namespace,
+            cache=cache,
+        )
 
-        if key in _cache:
-            value, ts = _cache[key]
-            if now - ts < ttl:
-                return value
+    def _get_memory(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
 
-        # Call the actual tool
-        result = await original_on_invoke(tool_context, tool_arguments)
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            del self._memory[key]
+            return None
 
-        _cache[key] = (result, time.time())
+        self._memory.move_to_end(key)
+        return value
 
-        return result
+    def _set_memory(self, key: str, value, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> tuple[Any, float | None]:
+        return self._cache().get(key, expire_time=True)
+
+    def _promote(self, key: str, entry: tuple[Any, float | None]):
+        # Runs on the event loop thread, the memory tier is not thread-safe
+        value, expires_at = entry
+        if value is not None and expires_at is not None:
+            self._set_memory(key, value, expires_at)
+        return value
+
+    def _set_disk(self, key: str, value, ttl: float, namespace: str):
+        self._cache().set(key, value, expire=ttl, tag=namespace)
+
+    def _cache(self) -> diskcache.Cache:
+        if self._disk is None:
+            self._disk = diskcache.Cache(self.path, size_limit=self.size_limit)
+        return self._disk
+
+
+tool_cache = ToolCache(
+    size_limit=int(os.getenv("TOOL_CACHE_SIZE_LIMIT", str(256 * 1024 * 1024))),
+    memory_entries=int(os.getenv("TOOL_CACHE_MEMORY_ENTRIES", "256")),
+)
+
+
+def cached_function_tool(tool, ttl: int):
+    """
+    Wrap a FunctionTool (or async function) and cache its results for TTL seconds.
+    """
+    original_on_invoke = tool.on_invoke_tool
+
+    async def cached_on_invoke(tool_context, tool_arguments):
+        return await tool_cache.get_or_call(
+            namespace=tool.name,
+            arguments=tool_arguments,
+            ttl=ttl,
+            call=lambda: original_on_invoke(tool_context, tool_arguments),
+        )
 
     # Construct a new FunctionTool with cached_on_invoke
     return FunctionTool(
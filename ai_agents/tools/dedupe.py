@@ -0,0 +1,127 @@
+import hashlib
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from ai_agents.tools.encoding import clean_text
+
+_PRIME = np.uint64((1 << 61) - 1)
+_EMPTY = np.uint64((1 << 32) - 1)
+
+
+@dataclass
+class NearDuplicateStats:
+    checked: int = 0
+    collapsed: int = 0
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingle sets.
+
+    The estimated Jaccard similarity of two sets is the fraction of equal
+    positions in their signatures.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Small enough that a * hash + b never overflows 64 bits
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def shingles(self, text: str) -> set[str]:
+        words = re.findall(r"[a-z0-9]+", clean_text(text).lower())
+        k = self.shingle_size
+        if len(words) <= k:
+            return {" ".join(words)} if words else set()
+        return {" ".join(gram) for gram in zip(*(words[i:] for i in range(k)))}
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, _EMPTY, dtype=np.uint64)
+        hashes = np.array(
+            [
+                int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest())
+                for s in shingles
+            ],
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1) & _EMPTY
+
+
+class NearDuplicateFilter:
+    """
+    Drop search results that repeat a story already seen.
+
+    Results are compared on title and description with MinHash, and
+    locality-sensitive hashing over bands of the signature finds candidate
+    matches without comparing every pair. The index persists across calls,
+    so one filter can be shared by every search in a session to collapse a
+    wire story syndicated across outlets and tickers.
+    """
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.threshold = threshold
+        self.bands = bands
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._signatures: list[np.ndarray] = []
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self._stats = NearDuplicateStats()
+
+    def filter(self, results: list[dict]) -> list[dict]:
+        """
+        Keep the first result of every story. A kept result gets a `similar`
+        count of the near duplicates collapsed into it by this call.
+        """
+        kept: list[dict] = []
+        kept_at: dict[int, int] = {}
+        for result in results:
+            self._stats.checked += 1
+            signature = self._hasher.signature(
+                f"{result.get('title') or ''} {result.get('description') or ''}"
+            )
+            match = self._match(signature)
+            if match is None:
+                kept_at[self._add(signature)] = len(kept)
+                kept.append(dict(result))
+                continue
+
+            self._stats.collapsed += 1
+            if match in kept_at:
+                original = kept[kept_at[match]]
+                original["similar"] = original.get("similar", 0) + 1
+        return kept
+
+    def stats(self) -> NearDuplicateStats:
+        return NearDuplicateStats(
+            checked=self._stats.checked, collapsed=self._stats.collapsed
+        )
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [band.tobytes() for band in np.split(signature, self.bands)]
+
+    def _match(self, signature: np.ndarray) -> int | None:
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, best_similarity = None, 0.0
+        for index in sorted(candidates):
+            similarity = float(np.mean(self._signatures[index] == signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = index, similarity
+        return best
+
+    def _add(self, signature: np.ndarray) -> int:
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(index)
+        return index
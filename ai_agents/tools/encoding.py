@@ -0,0 +1,109 @@
+import html
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Literal
+from urllib.parse import urlparse
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ResultEncoding:
+    """
+    How search results are rendered for an agent.
+
+    `url` keeps the full URL, only its domain (as `site`) or drops it.
+    Descriptions are cut to `description_chars` on a word boundary, and at
+    most `max_per_domain` results from the same site are kept.
+    """
+
+    url: Literal["full", "domain", "omit"] = "domain"
+    description_chars: int = 200
+    max_per_domain: int | None = 2
+    max_results: int | None = None
+
+
+def clean_text(text: str | None) -> str:
+    """
+    Strip the highlight markup Brave puts in titles and snippets.
+    """
+    if not text:
+        return ""
+    return _SPACE.sub(" ", html.unescape(_TAG.sub("", text))).strip()
+
+
+def encode_results(
+    results: list[dict],
+    encoding: ResultEncoding | None = None,
+) -> str:
+    """
+    Render search results as compact JSON: no whitespace, empty fields
+    omitted, publication dates without the time, and duplicate titles
+    dropped. `similar` counts near duplicates collapsed into a result.
+    """
+    encoding = encoding or ResultEncoding()
+
+    encoded = []
+    seen_titles = set()
+    per_domain: dict[str, int] = {}
+    for result in results:
+        title = clean_text(result.get("title"))
+        url = result.get("url") or ""
+        domain = _domain(url)
+
+        key = title.lower()
+        if key and key in seen_titles:
+            continue
+        if encoding.max_per_domain is not None and domain:
+            if per_domain.get(domain, 0) >= encoding.max_per_domain:
+                continue
+            per_domain[domain] = per_domain.get(domain, 0) + 1
+        seen_titles.add(key)
+
+        item = {"title": title}
+        if encoding.url == "full":
+            item["url"] = url
+        elif encoding.url == "domain":
+            item["site"] = domain
+        # Absolute, since encoded results are cached for hours
+        item["date"] = published_date(result.get("page_age"))
+        item["similar"] = result.get("similar")
+        item["description"] = truncate(
+            clean_text(result.get("description")), encoding.description_chars
+        )
+        encoded.append({key: value for key, value in item.items() if value})
+
+        if encoding.max_results is not None and len(encoded) >= encoding.max_results:
+            break
+
+    return json.dumps(encoded, separators=(",", ":"), ensure_ascii=False)
+
+
+def published_date(page_age: str | None) -> str:
+    """
+    Turn an ISO timestamp into its UTC date, like `2025-03-14`.
+    """
+    if not page_age:
+        return ""
+    try:
+        published = datetime.fromisoformat(page_age)
+    except ValueError:
+        return ""
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.astimezone(timezone.utc).date().isoformat()
+
+
+def truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:") + "…"
+
+
+def _domain(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    return host.removeprefix("www.")
@@ -0,0 +1,45 @@
+import importlib.util
+import os
+
+import httpx
+
+from observability.metrics import http_event_hooks
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client used by the search tools.
+
+    Connections are pooled and kept alive across calls, so only the first
+    request to a host pays for the TCP and TLS handshakes. HTTP/2 is used when
+    the optional `h2` package is installed, unless TOOLS_HTTP2 is set to 0.
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        http2 = os.getenv("TOOLS_HTTP2", "1") == "1"
+        _client = httpx.AsyncClient(
+            http2=http2 and importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(
+                float(os.getenv("TOOLS_HTTP_TIMEOUT", "10.0")),
+                connect=float(os.getenv("TOOLS_HTTP_CONNECT_TIMEOUT", "5.0")),
+            ),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("TOOLS_HTTP_MAX_CONNECTIONS", "10")),
+                max_keepalive_connections=5,
+                keepalive_expiry=60.0,
+            ),
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+            event_hooks=http_event_hooks(),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,24 +1,20 @@
-# from aiolimiter import AsyncLimiter
+import os
 
-# brave_limiter = AsyncLimiter(max_rate=1, time_period=1)  # 1 requests per second in average
+from concurrency.rate_limiter import RateLimiter, RateWindow
 
-import asyncio
-import time
-
-
-class RateLimiter:
-    def __init__(self, min_interval_seconds: float):
-        self.min_interval = min_interval_seconds
-        self._lock = asyncio.Lock()
-        self._last_called = 0.0
-
-    async def acquire(self):
-        async with self._lock:
-            now = time.monotonic()
-            elapsed = now - self._last_called
-            if elapsed < self.min_interval:
-                await asyncio.sleep(self.min_interval - elapsed)
-            self._last_called = time.monotonic()
-
-
-brave_limiter = RateLimiter(min_interval_seconds=1.5)  # 1 request per 1.5 seconds
+brave_limiter = RateLimiter(
+    name="brave_search",
+    windows=[
+        RateWindow(
+            name="second",
+            limit=int(os.getenv("BRAVE_REQUESTS_PER_SECOND", "1")),
+            period=1.0,
+            burst=1,
+        ),
+        RateWindow(
+            name="month",
+            limit=int(os.getenv("BRAVE_REQUESTS_PER_MONTH", "2000")),
+            period=30 * 86400.0,
+        ),
+    ],
+)
@@ -0,0 +1,54 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from agents import function_tool
+
+from ai_agents.tools.encoding import ResultEncoding, encode_results
+from observability.metrics import metrics
+from persistence.search_archive_repo import SearchArchiveRepository
+
+ARCHIVE_ENCODING = ResultEncoding(description_chars=200, max_per_domain=3)
+
+search_archive_repo = SearchArchiveRepository()
+
+
+async def archive_results(
+    results: list[dict],
+    query: str,
+    company: str | None = None,
+    ticker: str | None = None,
+):
+    """
+    Keep the results of a paid search. A failing write never fails the search.
+    """
+    try:
+        await asyncio.to_thread(
+            search_archive_repo.add_many, results, query, company, ticker
+        )
+    except sqlite3.Error:
+        metrics.inc("search_archive_errors_total")
+
+
+@function_tool
+async def search_news_archive(
+    query: str,
+    ticker: str | None = None,
+    max_age_days: int | None = 30,
+    limit: int = 10,
+) -> str:
+    """
+    Search web results and news fetched in earlier sessions, stored locally.
+    Free and instant: try it before a live search. Filter by ticker and by the
+    days since a result was last seen.
+    """
+    since = None
+    if max_age_days:
+        since = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+
+    rows = await asyncio.to_thread(
+        search_archive_repo.search, query, ticker=ticker, since=since, limit=limit
+    )
+    for row in rows:
+        row["page_age"] = row["page_age"] or row["last_seen_at"]
+    return encode_results(rows, ARCHIVE_ENCODING)
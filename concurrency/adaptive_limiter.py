@@ -0,0 +1,214 @@
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class AdaptiveConfig:
+    """
+    `latency_tolerance` is how far above its baseline a call's latency may be
+    and still count as flat. Retries wait `retry_base_delay * 2**attempt`
+    seconds with full jitter, capped at `retry_max_delay`.
+    """
+
+    initial_limit: int = 2
+    min_limit: int = 1
+    max_limit: int = 16
+    latency_tolerance: float = 1.5
+    backoff: float = 0.5
+    max_retries: int = 3
+    retry_base_delay: float = 2.0
+    retry_max_delay: float = 60.0
+
+
+@dataclass
+class AdaptiveLimiterStats:
+    limit: int
+    in_flight: int
+    max_in_flight: int
+    completed: int
+    failed: int
+    overloaded: int
+    retries: int
+    total_latency: float
+    total_queue_wait: float
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """
+        Completed calls per minute since the first call started.
+        """
+        return 60 * self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.completed if self.completed else 0.0
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for calls to an overloadable backend.
+
+    The limit grows by one after a full window of calls whose latency stayed
+    within `latency_tolerance` of the baseline for their key, and is cut by
+    `backoff` when a call fails with an overload signal (rate limit or
+    timeout). Overloaded calls are retried after a jittered exponential
+    delay. Only calls started after the last cut can cut it again, so a burst
+    of 429s from one window halves the limit once instead of collapsing it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_overload: Callable[[BaseException], bool],
+        config: AdaptiveConfig | None = None,
+        retry_after: Callable[[BaseException], float | None] | None = None,
+    ):
+        self.name = name
+        self.config = config = config or AdaptiveConfig()
+        self._is_overload = is_overload
+        self._retry_after = retry_after or (lambda _: None)
+
+        self._limit = float(config.initial_limit)
+        self._in_flight = 0
+        # Queued calls, each is handed its slot when one frees up
+        self._waiters: deque[asyncio.Future] = deque()
+        self._flat_calls = 0
+        self._baselines: dict[Hashable, float] = {}
+        self._last_decrease = 0.0
+        self._first_started: float | None = None
+
+        self._max_in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._overloaded = 0
+        self._retries = 0
+        self._total_latency = 0.0
+        self._total_queue_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def run(self, fn: Callable[[], Awaitable[T]], key: Hashable = None) -> T:
+        """
+        Run `fn` once a slot is free, retrying it while the backend is overloaded.
+
+        `key` groups calls with comparable latency, e.g. one agent.
+        """
+        config = self.config
+        for attempt in range(config.max_retries + 1):
+            await self._acquire()
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                self._release()
+                if not self._is_overload(e):
+                    self._failed += 1
+                    raise
+                self._on_overload(started)
+                if attempt == config.max_retries:
+                    self._failed += 1
+                    raise
+                self._retries += 1
+                await asyncio.sleep(self._retry_delay(attempt, e))
+                continue
+            except BaseException:
+                self._release()
+                raise
+
+            self._release()
+            self._on_success(key, time.monotonic() - started)
+            return result
+
+    def stats(self) -> AdaptiveLimiterStats:
+        now = time.monotonic()
+        return AdaptiveLimiterStats(
+            limit=self.limit,
+            in_flight=self._in_flight,
+            max_in_flight=self._max_in_flight,
+            completed=self._completed,
+            failed=self._failed,
+            overloaded=self._overloaded,
+            retries=self._retries,
+            total_latency=self._total_latency,
+            total_queue_wait=self._total_queue_wait,
+            elapsed=now - self._first_started if self._first_started else 0.0,
+        )
+
+    async def _acquire(self):
+        queued = time.monotonic()
+        if self._first_started is None:
+            self._first_started = queued
+        if self._waiters or self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Cancelled right after being handed a slot, pass it on
+                if not waiter.cancelled():
+                    self._release()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        else:
+            self._take_slot()
+        self._total_queue_wait += time.monotonic() - queued
+
+    def _take_slot(self):
+        self._in_flight += 1
+        self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        # Hand free slots to the queued calls in order
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take_slot()
+                waiter.set_result(None)
+
+    def _on_success(self, key: Hashable, latency: float):
+        self._completed += 1
+        self._total_latency += latency
+
+        # The baseline follows drops immediately and rises only slowly
+        baseline = self._baselines.get(key, latency)
+        baseline = min(latency, baseline + 0.05 * (latency - baseline))
+        self._baselines[key] = baseline
+
+        if latency > baseline * self.config.latency_tolerance:
+            self._flat_calls = 0
+            return
+        self._flat_calls += 1
+        if self._flat_calls >= self.limit:
+            self._flat_calls = 0
+            self._limit = min(self._limit + 1, self.config.max_limit)
+            self._wake()
+
+    def _on_overload(self, started: float):
+        self._overloaded += 1
+        self._flat_calls = 0
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._limit = max(self._limit * self.config.backoff, self.config.min_limit)
+
+    def _retry_delay(self, attempt: int, error: BaseException) -> float:
+        config = self.config
+        ceiling = min(config.retry_base_delay * 2**attempt, config.retry_max_delay)
+        delay = random.uniform(0, ceiling)
+        hint = self._retry_after(error)
+        return max(delay, hint) if hint is not None else delay
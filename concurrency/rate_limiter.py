@@ -0,0 +1,214 @@
+import asyncio
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+from observability.metrics import metrics
+from persistence.database import get_connection
+
+
+@dataclass(frozen=True)
+class RateWindow:
+    """
+    One quota window, e.g. 5 requests per 60 seconds.
+
+    `burst` is the bucket capacity (how many requests can go out back to back)
+    and defaults to the whole window limit.
+    """
+
+    name: str
+    limit: int
+    period: float
+    burst: int | None = None
+
+    @property
+    def capacity(self) -> float:
+        return float(self.burst or self.limit)
+
+    @property
+    def refill_rate(self) -> float:
+        return self.limit / self.period
+
+
+class QuotaExhaustedError(RuntimeError):
+    """
+    The quota cannot grant a request soon enough to be worth waiting for.
+    """
+
+
+@dataclass
+class RateLimiterStats:
+    acquired: int = 0
+    waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    remaining: dict[str, float] = field(default_factory=dict)
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter enforcing several quota windows at once.
+
+    When `shared` is set the bucket levels live in the `rate_limit_buckets`
+    table, so every process using the same database draws from one budget.
+    A request that would have to wait more than `max_wait` seconds, e.g. on
+    an exhausted daily window, fails with QuotaExhaustedError instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        windows: list[RateWindow],
+        shared: bool = True,
+        max_wait: float = 300.0,
+    ):
+        if not windows:
+            raise ValueError("A rate limiter needs at least one window.")
+
+        self.name = name
+        self.windows = windows
+        self.shared = shared
+        self.max_wait = max_wait
+        self._lock = asyncio.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._state: dict[str, tuple[float, float]] = {}
+        self._stats = RateLimiterStats()
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """
+        Wait until `tokens` are available in every window and consume them.
+
+        Returns the number of seconds spent waiting.
+        """
+        started = time.monotonic()
+        slept = False
+        async with self._lock:
+            while True:
+                if self.shared:
+                    # The bucket transaction is blocking SQLite work
+                    wait = await asyncio.to_thread(self._try_consume, tokens)
+                else:
+                    wait = self._try_consume(tokens)
+                if wait <= 0:
+                    break
+                if wait > self.max_wait:
+                    metrics.inc("rate_limiter_exhausted_total", limiter=self.name)
+                    raise QuotaExhaustedError(
+                        f"{self.name} quota exhausted, next request in {wait:.0f}s"
+                    )
+                slept = True
+                await asyncio.sleep(wait)
+
+        waited = time.monotonic() - started
+        self._stats.acquired += 1
+        if slept:
+            self._stats.waited += 1
+            self._stats.total_wait += waited
+            self._stats.max_wait = max(self._stats.max_wait, waited)
+        metrics.observe("rate_limiter_wait_seconds", waited, limiter=self.name)
+        return waited
+
+    def remaining(self) -> dict[str, float]:
+        """
+        Tokens currently available in each window.
+        """
+        now = time.time()
+        if self.shared:
+            state = self._load_state(self._connection())
+        else:
+            state = self._state
+
+        return {
+            window.name: self._refill(window, state.get(window.name), now)
+            for window in self.windows
+        }
+
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            acquired=self._stats.acquired,
+            waited=self._stats.waited,
+            total_wait=self._stats.total_wait,
+            max_wait=self._stats.max_wait,
+            remaining=self.remaining(),
+        )
+
+    def _try_consume(self, tokens: int) -> float:
+        """
+        Consume `tokens` if possible, otherwise return the seconds to wait.
+        """
+        if not self.shared:
+            return self._consume(self._state, tokens)
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = self._load_state(conn)
+            wait = self._consume(state, tokens)
+            if wait <= 0:
+                conn.executemany(
+                    """
+                    INSERT INTO rate_limit_buckets (limiter, window, tokens, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(limiter, window) DO UPDATE SET
+                        tokens = excluded.tokens,
+                        updated_at = excluded.updated_at
+                    """,
+                    [
+                        (self.name, window, level, updated_at)
+                        for window, (level, updated_at) in state.items()
+                    ],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _consume(self, state: dict[str, tuple[float, float]], tokens: int) -> float:
+        now = time.time()
+        levels = {
+            window.name: self._refill(window, state.get(window.name), now)
+            for window in self.windows
+        }
+
+        wait = 0.0
+        for window in self.windows:
+            if tokens > window.capacity:
+                raise ValueError(
+                    f"Cannot acquire {tokens} tokens from window {window.name} "
+                    f"of capacity {window.capacity}."
+                )
+            missing = tokens - levels[window.name]
+            if missing > 0:
+                wait = max(wait, missing / window.refill_rate)
+
+        if wait > 0:
+            return wait
+
+        for window in self.windows:
+            state[window.name] = (levels[window.name] - tokens, now)
+        return 0.0
+
+    def _refill(
+        self, window: RateWindow, entry: tuple[float, float] | None, now: float
+    ) -> float:
+        if entry is None:
+            return window.capacity
+
+        level, updated_at = entry
+        elapsed = max(0.0, now - updated_at)
+        return min(window.capacity, level + elapsed * window.refill_rate)
+
+    def _load_state(self, conn: sqlite3.Connection) -> dict[str, tuple[float, float]]:
+        rows = conn.execute(
+            "SELECT window, tokens, updated_at FROM rate_limit_buckets WHERE limiter = ?",
+            (self.name,),
+        ).fetchall()
+        return {window: (tokens, updated_at) for window, tokens, updated_at in rows}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Bucket transactions run in worker threads
+            self._conn = get_connection(check_same_thread=False)
+            self._conn.isolation_level = None
+        return self._conn
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+from observability.metrics import metrics
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class ProviderThrottledError(RuntimeError):
+    """
+    The provider answered, but with a "slow down" payload instead of data.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message, retry_after)
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised without calling the provider while its circuit breaker is open.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Transient failures worth another attempt: timeouts, dropped connections,
+    throttling and 5xx responses. Anything else is a real answer.
+    """
+    if isinstance(error, (ProviderThrottledError, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def retry_after(error: BaseException) -> float | None:
+    if isinstance(error, ProviderThrottledError):
+        return error.retry_after
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, hint: float | None = None) -> float:
+        """
+        Full-jitter exponential backoff, never shorter than the provider's hint.
+        """
+        ceiling = min(self.base_delay * 2**attempt, self.max_delay)
+        delay = random.uniform(0, ceiling)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is down.
+
+    After `failure_threshold` consecutive transient failures the breaker
+    opens and rejects calls for `reset_timeout` seconds. Then one probe call
+    is let through (half open): success closes the breaker, failure opens it
+    again.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self):
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._set_state("half_open")
+        if self._probing:
+            raise CircuitOpenError(f"{self.name} circuit is half open")
+        self._probing = True
+
+    def release(self):
+        """
+        Give back a half-open probe that ended without an answer.
+        """
+        self._probing = False
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+        if self.state != "closed":
+            self._set_state("closed")
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+    def _set_state(self, state: str):
+        self.state = state
+        metrics.set("circuit_breaker_state", BREAKER_STATES[state], provider=self.name)
+
+
+class Resilience:
+    """
+    Retries with backoff behind a circuit breaker, for one provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(name)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call `fn`, retrying transient failures. Each attempt is a fresh call,
+        so `fn` should include any rate limiting of the request.
+        """
+        for attempt in range(self.policy.max_attempts):
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                metrics.inc(
+                    "provider_attempts_total", provider=self.name, outcome="rejected"
+                )
+                raise
+
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider is up, it just had no answer for this request
+                    self.breaker.record_success()
+                    metrics.inc(
+                        "provider_attempts_total", provider=self.name, outcome="error"
+                    )
+                    raise
+                self.breaker.record_failure()
+                metrics.inc(
+                    "provider_attempts_total", provider=self.name, outcome="retryable"
+                )
+                if attempt == self.policy.max_attempts - 1:
+                    raise
+                await asyncio.sleep(self.policy.delay(attempt, retry_after(e)))
+                continue
+
+            self.breaker.record_success()
+            metrics.inc(
+                "provider_attempts_total", provider=self.name, outcome="success"
+            )
+            return result
+
+
+_providers: dict[str, Resilience] = {}
+
+
+def provider_resilience(name: str) -> Resilience:
+    """
+    The process-wide resilience layer of a provider, so every client of the
+    same provider shares one circuit breaker.
+    """
+    if name not in _providers:
+        _providers[name] = Resilience(
+            name,
+            policy=RetryPolicy(
+                max_attempts=int(os.getenv("PROVIDER_MAX_ATTEMPTS", "4")),
+                max_delay=float(os.getenv("PROVIDER_MAX_RETRY_DELAY", "30")),
+            ),
+            breaker=CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv("PROVIDER_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("PROVIDER_BREAKER_RESET", "60")),
+            ),
+        )
+    return _providers[name]
@@ -0,0 +1,56 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls sharing the same key.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still in flight await the same task instead of starting their own. With
+    `cancel_abandoned` the work is cancelled once every caller has given up
+    on it.
+    """
+
+    def __init__(self, cancel_abandoned: bool = False):
+        self.cancel_abandoned = cancel_abandoned
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: Counter[Hashable] = Counter()
+        self._stats = SingleFlightStats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats.coalesced += 1
+
+        # Shielded so a cancelled caller does not cancel work others still
+        # wait for
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if self.cancel_abandoned and not task.done():
+                    task.cancel()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._stats.calls, coalesced=self._stats.coalesced
+        )
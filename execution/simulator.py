@@ -3,10 +3,13 @@ import uuid
 from datetime import datetime, timezone
 from typing import List
 
+import numpy as np
+
 from ai_agents.portfolio_allocation.schema import PortfolioAllocation
 from execution.models.portfolio_state import PortfolioState
 from execution.models.position import Position
 from execution.models.trade import Trade
+from market_data.snapshot import QuoteSnapshot
 
 
 class ExecutionResult:
@@ -40,29 +43,28 @@ class ExecutionSimulator:
         trades: List[Trade] = []
         cash = portfolio_state.cash
 
-        # Compute portfolio value
-        portfolio_value = await self._portfolio_value(portfolio_state)
-
         # Build allocation lookup
         target_allocations = {p.ticker: p for p in allocation.positions}
 
-        # Fetch prices once per ticker
-        prices = {}
-        quotes = await self.market_data_provider.get_market_quotes(
-            list(target_allocations.keys())
+        # Fetch prices once per ticker, held ones for the portfolio value
+        prices = await self.market_data_provider.get_quote_snapshot(
+            [*portfolio_state.positions.keys(), *target_allocations.keys()]
         )
-        prices = {q: quotes[q].price for q in quotes}
+
+        # Compute portfolio value
+        portfolio_value = self._portfolio_value(portfolio_state, prices)
 
         # SELL phase (allocation-driven)
         for ticker, position in list(portfolio_state.positions.items()):
-            price = prices.get(ticker)
-            if price is None:
-                continue
-
+            # Only tickers the allocation lists are traded, holdings it
+            # leaves out are kept as they are
             target = target_allocations.get(ticker)
+            price = prices.price(ticker)
+            if target is None or price is None:
+                continue
 
             # Full liquidation
-            if target is None or target.allocation_pct == 0.0:
+            if target.allocation_pct == 0.0:
                 quantity = position.quantity
                 proceeds = quantity * price
                 cash += proceeds - self.commission
@@ -125,7 +127,10 @@ class ExecutionSimulator:
 
         # BUY phase (allocation-driven)
         for ticker, target in target_allocations.items():
-            price = prices[ticker]
+            price = prices.price(ticker)
+            if price is None:
+                continue
+
             position = portfolio_state.positions.get(ticker)
 
             current_value = position.quantity * price if position else 0.0
@@ -197,13 +202,22 @@ class ExecutionSimulator:
         trades: List[Trade] = []
         cash = portfolio_state.cash
 
-        for ticker, position in list(portfolio_state.positions.items()):
-            quote = await self.market_data_provider.get_latest_quote(ticker)
-            price = quote.price
-            stop_loss_price = position.avg_price * (1 - position.stop_loss_pct / 100.0)
+        tickers = list(portfolio_state.positions.keys())
+        positions = list(portfolio_state.positions.values())
+        snapshot = await self.market_data_provider.get_quote_snapshot(tickers)
 
-            if price >= stop_loss_price:
-                continue
+        # Positions without a price are left alone, NaN never compares below
+        prices = snapshot.prices(tickers)
+        stop_loss_prices = np.array(
+            [p.avg_price * (1 - p.stop_loss_pct / 100.0) for p in positions],
+            dtype=np.float64,
+        )
+        triggered = np.flatnonzero(prices < stop_loss_prices)
+
+        for i in triggered:
+            ticker, position = tickers[i], positions[i]
+            price = float(prices[i])
+            stop_loss_price = float(stop_loss_prices[i])
 
             quantity = position.quantity
             proceeds = quantity * price
@@ -236,19 +250,22 @@ class ExecutionSimulator:
             timestamp=datetime.now(timezone.utc),
         )
 
-    async def _portfolio_value(self, portfolio_state: PortfolioState) -> float:
+    def _portfolio_value(
+        self, portfolio_state: PortfolioState, prices: QuoteSnapshot
+    ) -> float:
         """
         Calculate the total value of the portfolio (cash + market value of positions).
         """
-        value = portfolio_state.cash
+        positions = list(portfolio_state.positions.values())
+        market_prices = prices.prices([position.ticker for position in positions])
 
-        quotes = await self.market_data_provider.get_market_quotes(
-            list(portfolio_state.positions.keys())
-        )
-        for position in portfolio_state.positions.values():
-            value += position.quantity * quotes[position.ticker].price
+        missing = np.isnan(market_prices)
+        if missing.any():
+            ticker = positions[np.argmax(missing)].ticker
+            raise ValueError(f"Missing price for ticker {ticker}")
 
-        return value
+        quantities = np.array([p.quantity for p in positions], dtype=np.float64)
+        return portfolio_state.cash + float(quantities @ market_prices)
 
     async def _make_trade(
         self,
@@ -1,106 +1,442 @@
+import argparse
 import asyncio
-import random
+import json
+import os
+import uuid
+from dataclasses import asdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import TypedDict
 
 from agents import custom_span, trace
 from dotenv import load_dotenv
 
 from ai_agents.decision_agent.agent import run_decision_agent
+from ai_agents.decision_agent.schema import InvestmentDecisionOutput
 from ai_agents.fundamental_scout.agent import run_fundamental_scout
-from ai_agents.opportunity_scout.agent import run_opportunity_scout
+from ai_agents.fundamental_scout.reuse import ReusePolicy, news_fingerprint
+from ai_agents.fundamental_scout.schema import FundamentalScoutOutput
+from ai_agents.opportunity_scout.agent import (
+    run_opportunity_scout,
+    run_sharded_opportunity_scout,
+)
+from ai_agents.opportunity_scout.schema import OpportunityScoutOutput
 from ai_agents.portfolio_allocation.agent import run_portfolio_allocation
+from ai_agents.portfolio_allocation.schema import PortfolioAllocation
 from ai_agents.risk_analyst.agent import run_risk_analyst
-from execution.simulator import ExecutionSimulator
-from market_data.provider import MarketDataProvider
+from ai_agents.risk_analyst.schema import RiskProfile
+from ai_agents.runner import agent_limiter
+from ai_agents.tools.brave_search import (
+    fetch_company_overview,
+    fetch_latest_news,
+    prefetch_company_research,
+)
+from ai_agents.tools.cache import tool_cache
+from ai_agents.tools.http_client import close_http_client
+from execution.models.portfolio_state import PortfolioState
+from execution.models.trade import Trade
+from execution.simulator import ExecutionResult, ExecutionSimulator
+from market_data.composite import create_market_data_provider
+from observability.metrics import METRICS_PATH, metrics
+from persistence.analysis_repo import AnalysisRepository, StoredAnalysis
 from persistence.database import init_db
+from persistence.metrics_repo import MetricsRepository
 from persistence.portfolio_repo import PortfolioRepository
+from persistence.session_repo import SessionRepository
 from persistence.trade_repo import TradeRepository
 from portfolio_calculator.portfolio_calculator import PortfolioCalculator
-from universe.sp500 import load_sp500_tickers
+from session.dag import Checkpoint, SessionDAG, json_checkpoint
+from session.scheduler import (
+    PipelineScheduler,
+    SchedulerConfig,
+    Stage,
+    unscheduled_stage,
+)
+from universe.prescreen import (
+    PreScreenConfig,
+    ScreenedTicker,
+    prescreen_universe,
+    universe_indicators,
+)
+from universe.sp500 import load_sp500_universe
 
 
-async def main():
+async def main(session_id: str | None = None):
     load_dotenv()
     init_db()
 
-    market_data_provider = MarketDataProvider()
+    market_data_provider = create_market_data_provider()
     portfolio_repo = PortfolioRepository()
-    current_portfolio = portfolio_repo.load()
-    portfolio_metrics = PortfolioCalculator.calculate(
-        state=current_portfolio,
-        prices=await market_data_provider.get_market_quotes(
-            list(current_portfolio.positions.keys())
-        ),
-    )
 
-    universe = load_sp500_tickers()
-    random.shuffle(universe)
+    dag = SessionDAG(session_id or uuid.uuid4().hex[:12])
+    print(f"Session {dag.session_id}")
+
+    # Inject overview and news into the Fundamental Scout prompt instead of
+    # letting it call the search tools first
+    prefetch_research = os.getenv("FUNDAMENTAL_PREFETCH", "1") == "1"
+    # Fail the pipelines stage when any pipeline fails, for --resume
+    fail_on_pipeline_error = os.getenv("PIPELINE_FAIL_ON_ERROR", "0") == "1"
+
+    async def load_portfolio() -> PortfolioState:
+        return portfolio_repo.load()
+
+    async def value_portfolio(portfolio: PortfolioState) -> float:
+        return PortfolioCalculator.calculate(
+            state=portfolio,
+            prices=await market_data_provider.get_quote_snapshot(
+                list(portfolio.positions.keys())
+            ),
+        ).total_value
+
+    async def prescreen() -> list[ScreenedTicker]:
+        universe = load_sp500_universe()
+        config = PreScreenConfig(top_n=int(os.getenv("PRESCREEN_TOP_N", "60")))
+        return await prescreen_universe(
+            universe=universe,
+            indicators=universe_indicators(
+                universe["ticker"].tolist(),
+                start=date.today() - timedelta(days=config.history_days),
+            ),
+            config=config,
+        )
 
-    with trace("ai-investor-session"):
-        opportunity_results = await run_opportunity_scout(
-            ticker_list=universe,
-            portfolio_tickers=list(current_portfolio.positions.keys()),
-            portfolio_value=portfolio_metrics.total_value,
-            cash_available=current_portfolio.cash,
+    async def opportunity_scout(
+        portfolio: PortfolioState,
+        portfolio_value: float,
+        prescreen: list[ScreenedTicker],
+    ) -> OpportunityScoutOutput:
+        # On a cold start nothing was ranked and every signal is n/a, the
+        # plain ticker list is enough
+        ranked = any(s.ranked for s in prescreen)
+        if os.getenv("OPPORTUNITY_SCOUT_MODE", "single") == "sharded":
+            universe = load_sp500_universe()
+            screened_tickers = [s.ticker for s in prescreen]
+            return await run_sharded_opportunity_scout(
+                universe=universe[universe["ticker"].isin(screened_tickers)],
+                ticker_signals=(
+                    {s.ticker: s.summary() for s in prescreen} if ranked else None
+                ),
+                portfolio_tickers=list(portfolio.positions.keys()),
+                portfolio_value=portfolio_value,
+                cash_available=portfolio.cash,
+                max_candidates=3,
+                max_concurrency=int(os.getenv("OPPORTUNITY_SCOUT_CONCURRENCY", "4")),
+            )
+        return await run_opportunity_scout(
+            ticker_list=[s.ticker for s in prescreen],
+            ticker_signals=[s.summary() for s in prescreen] if ranked else None,
+            portfolio_tickers=list(portfolio.positions.keys()),
+            portfolio_value=portfolio_value,
+            cash_available=portfolio.cash,
             max_candidates=3,
         )
 
-        pipelines = [
-            run_company_pipeline(
-                ticker=candidate.ticker,
-                company_name=candidate.company_name,
-                portfolio=current_portfolio,
-                portfolio_metrics=portfolio_metrics,
+    async def pipelines(
+        portfolio: PortfolioState,
+        portfolio_value: float,
+        opportunity_scout: OpportunityScoutOutput,
+    ) -> list[CompanyPipelineResult]:
+        deadline = os.getenv("PIPELINE_SESSION_DEADLINE")
+        scheduler = PipelineScheduler(
+            SchedulerConfig(
+                workers=int(os.getenv("PIPELINE_WORKERS", "2")),
+                stage_timeout=float(os.getenv("PIPELINE_STAGE_TIMEOUT", "300")),
+                deadline=float(deadline) if deadline else None,
+            )
+        )
+        # Start every candidate's searches now instead of when its pipeline
+        # gets a worker, highest ranked first
+        prefetch = None
+        if prefetch_research:
+            pending = sorted(
+                (
+                    c
+                    for c in opportunity_scout.candidates
+                    if not dag.is_completed(f"pipeline:{c.ticker}")
+                ),
+                key=lambda c: c.rank,
+                reverse=True,
+            )
+            prefetch = asyncio.create_task(
+                prefetch_company_research([(c.company_name, c.ticker) for c in pending])
             )
-            for candidate in opportunity_results.candidates
-        ]
 
-        pipeline_results = await asyncio.gather(*pipelines)
+        # Each pipeline is checkpointed on its own, so a resumed session only
+        # re-runs the candidates that failed or never finished
+        outcomes = await scheduler.run(
+            candidates=opportunity_scout.candidates,
+            pipeline=lambda candidate, stage: dag.step(
+                f"pipeline:{candidate.ticker}",
+                lambda: run_company_pipeline(
+                    ticker=candidate.ticker,
+                    company_name=candidate.company_name,
+                    portfolio=portfolio,
+                    portfolio_value=portfolio_value,
+                    inject_research=prefetch_research,
+                    stage=stage,
+                ),
+                checkpoint=PIPELINE_CHECKPOINT,
+            ),
+        )
+        if prefetch is not None:
+            prefetch.cancel()
+            await asyncio.gather(prefetch, return_exceptions=True)
+        failed = [outcome for outcome in outcomes if not outcome.ok]
+        for outcome in failed:
+            metrics.inc(
+                "company_pipeline_failures_total", ticker=outcome.candidate.ticker
+            )
+        # Allocation goes on with whatever finished. With
+        # PIPELINE_FAIL_ON_ERROR=1 the stage fails instead, so --resume
+        # re-runs only the failed candidates, the completed ones keep their
+        # own checkpoints.
+        if failed and fail_on_pipeline_error:
+            raise RuntimeError(
+                f"{len(failed)} of {len(outcomes)} company pipelines failed: "
+                + "; ".join(
+                    f"{outcome.candidate.ticker} ({outcome.error})"
+                    for outcome in failed
+                )
+            )
+        return [outcome.result for outcome in outcomes if outcome.ok]
 
-        portfolio_allocation = await run_portfolio_allocation(
-            total_portfolio_value=portfolio_metrics.total_value,
-            current_positions=list(current_portfolio.positions.keys()),
-            available_cash=current_portfolio.cash,
-            risk_profiles=[result["risk_analysis"] for result in pipeline_results],
+    async def allocation(
+        portfolio: PortfolioState,
+        portfolio_value: float,
+        pipelines: list[CompanyPipelineResult],
+    ) -> PortfolioAllocation:
+        return await run_portfolio_allocation(
+            total_portfolio_value=portfolio_value,
+            current_positions=list(portfolio.positions.keys()),
+            available_cash=portfolio.cash,
+            risk_profiles=[result["risk_analysis"] for result in pipelines],
             investment_decisions=[
-                result["investment_decision"] for result in pipeline_results
+                result["investment_decision"] for result in pipelines
             ],
         )
 
-    simulator = ExecutionSimulator(
-        market_data_provider=market_data_provider,
-        commission_per_trade=4.0,
+    async def execution(
+        portfolio: PortfolioState, allocation: PortfolioAllocation
+    ) -> ExecutionResult:
+        simulator = ExecutionSimulator(
+            market_data_provider=market_data_provider,
+            commission_per_trade=4.0,
+        )
+        return await simulator.execute_allocation(
+            allocation=allocation,
+            portfolio_state=portfolio,
+        )
+
+    async def save_portfolio(execution: ExecutionResult):
+        portfolio_repo.save(
+            state=execution.portfolio_state, reason="allocation_execution"
+        )
+
+    async def save_trades(execution: ExecutionResult):
+        TradeRepository.save_many(execution.trades)
+
+    dag.add("portfolio", load_portfolio, checkpoint=json_checkpoint(PortfolioState))
+    dag.add(
+        "portfolio_value",
+        value_portfolio,
+        deps=("portfolio",),
+        checkpoint=json_checkpoint(float),
+    )
+    dag.add("prescreen", prescreen, checkpoint=json_checkpoint(list[ScreenedTicker]))
+    dag.add(
+        "opportunity_scout",
+        opportunity_scout,
+        deps=("portfolio", "portfolio_value", "prescreen"),
+        checkpoint=json_checkpoint(OpportunityScoutOutput),
+    )
+    dag.add(
+        "pipelines",
+        pipelines,
+        deps=("portfolio", "portfolio_value", "opportunity_scout"),
+        checkpoint=json_checkpoint(list[CompanyPipelineResult]),
     )
+    dag.add(
+        "allocation",
+        allocation,
+        deps=("portfolio", "portfolio_value", "pipelines"),
+        checkpoint=json_checkpoint(PortfolioAllocation),
+    )
+    dag.add(
+        "execution",
+        execution,
+        deps=("portfolio", "allocation"),
+        checkpoint=EXECUTION_CHECKPOINT,
+    )
+    dag.add("save_portfolio", save_portfolio, deps=("execution",))
+    dag.add("save_trades", save_trades, deps=("execution",))
+
+    try:
+        with trace("ai-investor-session"):
+            await dag.run()
+    except Exception:
+        print(f"Session {dag.session_id} failed, resume with --resume {dag.session_id}")
+        raise
+    finally:
+        if dag.resumed:
+            print(f"Restored from checkpoints: {', '.join(dag.resumed)}")
+        await market_data_provider.close()
+        await close_http_client()
+        export_metrics(dag.session_id)
+        tool_cache.close()
 
-    execution_results = await simulator.execute_allocation(
-        allocation=portfolio_allocation,
-        portfolio_state=current_portfolio,
+
+def export_metrics(session_id: str):
+    """
+    Store the session metrics in SQLite and write the Prometheus text file.
+    """
+    for namespace, stats in tool_cache.stats().items():
+        metrics.set("tool_cache_hit_rate", stats.hit_rate, tool=namespace)
+    metrics.set("tool_cache_coalesced_calls", tool_cache.coalesced())
+
+    stats = agent_limiter.stats()
+    metrics.set("agent_concurrency_limit", stats.limit)
+    metrics.set("agent_concurrency_max_in_flight", stats.max_in_flight)
+    metrics.set("agent_throughput_per_minute", stats.throughput)
+    metrics.set("agent_overloaded_calls", stats.overloaded)
+    metrics.set("agent_retries", stats.retries)
+    metrics.set("agent_queue_wait_seconds", stats.total_queue_wait)
+    metrics.set("agent_completed_calls", stats.completed)
+
+    MetricsRepository().save_many(session_id, metrics.samples())
+    metrics.write_prometheus(Path(os.getenv("METRICS_PATH", str(METRICS_PATH))))
+
+
+class CompanyPipelineResult(TypedDict):
+    ticker: str
+    company_name: str
+    fundamental_analysis: FundamentalScoutOutput
+    investment_decision: InvestmentDecisionOutput
+    risk_analysis: RiskProfile
+
+
+PIPELINE_CHECKPOINT = json_checkpoint(CompanyPipelineResult)
+
+
+def _encode_execution(result: ExecutionResult) -> str:
+    return json.dumps(
+        {
+            "portfolio_state": result.portfolio_state.model_dump(mode="json"),
+            "trades": [
+                {
+                    **asdict(trade),
+                    "trade_id": str(trade.trade_id),
+                    "portfolio_id": str(trade.portfolio_id),
+                    "executed_at": trade.executed_at.isoformat(),
+                }
+                for trade in result.trades
+            ],
+            "timestamp": result.timestamp.isoformat(),
+        }
     )
-    portfolio_repo.save(
-        state=execution_results.portfolio_state, reason="allocation_execution"
+
+
+def _decode_execution(output: str) -> ExecutionResult:
+    data = json.loads(output)
+    return ExecutionResult(
+        portfolio_state=PortfolioState.model_validate(data["portfolio_state"]),
+        trades=[
+            Trade(
+                **{**trade, "executed_at": datetime.fromisoformat(trade["executed_at"])}
+            )
+            for trade in data["trades"]
+        ],
+        timestamp=datetime.fromisoformat(data["timestamp"]),
     )
-    TradeRepository.save_many(execution_results.trades)
-    await market_data_provider.close()
+
+
+EXECUTION_CHECKPOINT = Checkpoint(encode=_encode_execution, decode=_decode_execution)
 
 
 async def run_company_pipeline(
-    ticker: str, company_name: str, portfolio: dict, portfolio_metrics
-) -> dict:
+    ticker: str,
+    company_name: str,
+    portfolio: PortfolioState,
+    portfolio_value: float,
+    inject_research: bool = True,
+    stage: Stage = unscheduled_stage,
+) -> CompanyPipelineResult:
     with custom_span(f"pipeline-candidate-{ticker}"):
-        fundamental_analysis = await run_fundamental_scout(
-            ticker=ticker,
-            company_name=company_name,
+        analysis_repo = AnalysisRepository()
+        policy = ReusePolicy(
+            window=timedelta(hours=float(os.getenv("ANALYSIS_REUSE_HOURS", "24"))),
+            min_similarity=float(os.getenv("ANALYSIS_REUSE_MIN_SIMILARITY", "0.8")),
         )
 
-        risk_analysis = await run_risk_analyst(
-            fundamental_analysis=fundamental_analysis,
-            portfolio_value=portfolio_metrics.total_value,
+        # Fingerprint the news the analysis would be based on. Without them
+        # nothing is reused and the scout searches with its own tools.
+        try:
+            overview, news = await stage(
+                "news",
+                asyncio.gather(
+                    fetch_company_overview(company_name, ticker=ticker),
+                    fetch_latest_news(company_name, ticker=ticker),
+                ),
+            )
+        except Exception:
+            metrics.inc("company_research_fetch_failures_total", ticker=ticker)
+            overview = news = None
+        fetched = news is not None
+        fingerprint = news_fingerprint(overview, news) if fetched else []
+        stored = analysis_repo.load(ticker)
+
+        reuse = fetched and policy.reuse_fundamentals(stored, fingerprint)
+        if reuse:
+            fundamental_analysis = stored.fundamental_analysis
+            analyzed_at = stored.analyzed_at
+        else:
+            fundamental_analysis = await stage(
+                "fundamental",
+                run_fundamental_scout(
+                    ticker=ticker,
+                    company_name=company_name,
+                    overview=overview if inject_research else None,
+                    news=news if inject_research else None,
+                ),
+            )
+            analyzed_at = datetime.now(timezone.utc)
+
+        reuse_risk = reuse and policy.reuse_risk(stored, portfolio_value)
+        if reuse_risk:
+            risk_analysis = stored.risk_analysis
+        else:
+            risk_analysis = await stage(
+                "risk",
+                run_risk_analyst(
+                    fundamental_analysis=fundamental_analysis,
+                    portfolio_value=portfolio_value,
+                ),
+            )
+
+        # The decision depends on the current portfolio, so it always runs
+        decision_result = await stage(
+            "decision",
+            run_decision_agent(
+                ticker=ticker,
+                fundamental_analysis=fundamental_analysis,
+                risk_analysis=risk_analysis,
+                portfolio=portfolio,
+            ),
         )
 
-        decision_result = await run_decision_agent(
-            ticker=ticker,
-            fundamental_analysis=fundamental_analysis,
-            risk_analysis=risk_analysis,
-            portfolio=portfolio,
+        analysis_repo.save(
+            StoredAnalysis(
+                ticker=ticker,
+                # Keep the baseline so small changes cannot accumulate unseen
+                fingerprint=stored.fingerprint if reuse else fingerprint,
+                fundamental_analysis=fundamental_analysis,
+                risk_analysis=risk_analysis,
+                investment_decision=decision_result,
+                # The value the risk profile was sized for, as drift baseline
+                portfolio_value=(
+                    stored.portfolio_value if reuse_risk else portfolio_value
+                ),
+                analyzed_at=analyzed_at,
+            )
         )
 
     return {
@@ -113,4 +449,16 @@ async def run_company_pipeline(
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run an AI investor session.")
+    parser.add_argument(
+        "--resume",
+        metavar="SESSION",
+        help="Resume a session, re-running only the stages that did not complete.",
+    )
+    args = parser.parse_args()
+
+    if args.resume:
+        init_db()
+        if not SessionRepository().exists(args.resume):
+            parser.error(f"Unknown session {args.resume}")
+    asyncio.run(main(session_id=args.resume))
@@ -0,0 +1,281 @@
+import asyncio
+import mmap
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+BARS_PATH = Path("data/bars")
+
+# One raw little-endian column file per field, per ticker
+BAR_FIELDS: dict[str, np.dtype] = {
+    "date": np.dtype("<M8[D]"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Bars:
+    """
+    Daily OHLCV bars of one ticker, one array per field, sorted by date.
+    """
+
+    date: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @classmethod
+    def from_records(
+        cls, dates: list[str], records: list[tuple[float, float, float, float, float]]
+    ) -> "Bars":
+        """
+        Build bars from ISO dates and matching (open, high, low, close, volume) rows.
+        """
+        values = np.asarray(records, dtype=np.float64).reshape(-1, len(PRICE_FIELDS))
+        return cls(
+            date=np.asarray(dates, dtype=BAR_FIELDS["date"]),
+            **{name: values[:, i] for i, name in enumerate(PRICE_FIELDS)},
+        )
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        return cls(
+            **{name: np.empty(0, dtype=dtype) for name, dtype in BAR_FIELDS.items()}
+        )
+
+
+@dataclass(frozen=True)
+class BarPanel:
+    """
+    Bars of several tickers aligned on a common date axis.
+
+    Each field is a (dates x tickers) array; days a ticker did not trade are NaN.
+    """
+
+    dates: np.ndarray
+    tickers: list[str]
+    fields: dict[str, np.ndarray]
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.fields[field]
+
+
+class BarStore:
+    """
+    Columnar, memory-mapped store of daily bars.
+
+    Every ticker has its own directory with one raw column file per field, so
+    reads are zero-copy memory maps and appends only write the new rows.
+    """
+
+    def __init__(self, root: Path = BARS_PATH):
+        self.root = Path(root)
+
+    def tickers(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir() if (path / "date.bin").exists()
+        )
+
+    def load(self, ticker: str, fields: tuple[str, ...] = PRICE_FIELDS) -> Bars:
+        """
+        Memory-map the stored bars of a ticker. Fields not requested are empty.
+        """
+        ticker = ticker.upper()
+        directory = self.root / ticker
+
+        dates = self._map_column(directory / "date.bin", BAR_FIELDS["date"])
+        if len(dates) == 0:
+            return Bars.empty()
+
+        columns = {
+            name: self._map_column(directory / f"{name}.bin", BAR_FIELDS[name])
+            for name in fields
+        }
+        # A crash between column writes leaves some columns longer than others
+        rows = min(len(column) for column in (dates, *columns.values()))
+        empty = Bars.empty()
+        return Bars(
+            date=dates[:rows],
+            **{
+                name: columns[name][:rows] if name in columns else getattr(empty, name)
+                for name in PRICE_FIELDS
+            },
+        )
+
+    def last_date(self, ticker: str) -> date | None:
+        dates = self.load(ticker, fields=()).date
+        if len(dates) == 0:
+            return None
+        return dates[-1].astype(date)
+
+    def append(self, ticker: str, bars: Bars) -> int:
+        """
+        Append the bars newer than the last stored day. Returns rows written.
+        """
+        ticker = ticker.upper()
+        if len(bars) == 0:
+            return 0
+
+        order = np.argsort(bars.date, kind="stable")
+        dates = bars.date[order].astype(BAR_FIELDS["date"])
+        _, unique = np.unique(dates, return_index=True)
+        order = order[unique]
+        dates = dates[unique]
+
+        stored = self.load(ticker)
+        rows = len(stored)
+        if rows:
+            keep = dates > stored.date[-1]
+            order = order[keep]
+            dates = dates[keep]
+        if len(dates) == 0:
+            return 0
+
+        directory = self.root / ticker
+        directory.mkdir(parents=True, exist_ok=True)
+        byte_rows = {name: rows * dtype.itemsize for name, dtype in BAR_FIELDS.items()}
+
+        # Price columns first and the date column last: the row count of a
+        # ticker is bounded by the date column, so partial writes stay hidden
+        for name in PRICE_FIELDS:
+            values = getattr(bars, name)[order].astype(BAR_FIELDS[name])
+            self._write_column(directory / f"{name}.bin", values, byte_rows[name])
+        self._write_column(directory / "date.bin", dates, byte_rows["date"])
+
+        return len(dates)
+
+    def load_panel(
+        self,
+        tickers: list[str],
+        fields: tuple[str, ...] = PRICE_FIELDS,
+        start: date | None = None,
+    ) -> BarPanel:
+        """
+        Align the bars of several tickers on the union of their dates, from
+        `start` on when given. Only the rows from `start` are copied.
+        """
+        tickers = [ticker.upper() for ticker in tickers]
+        columns = []
+        for ticker in tickers:
+            bars = self.load(ticker, fields=fields)
+            first = 0
+            if start is not None:
+                first = int(np.searchsorted(bars.date, np.datetime64(start, "D")))
+            columns.append(
+                (
+                    bars.date[first:],
+                    {name: getattr(bars, name)[first:] for name in fields},
+                )
+            )
+
+        dates = _date_axis([column_dates for column_dates, _ in columns])
+
+        # Filled one ticker per row, which keeps the writes contiguous, and
+        # returned transposed as (dates x tickers) views
+        panel = {name: np.full((len(tickers), len(dates)), np.nan) for name in fields}
+        for row, (column_dates, values) in enumerate(columns):
+            if len(column_dates) == 0:
+                continue
+            at = _calendar_index(column_dates, dates)
+            for name in fields:
+                panel[name][row, at] = values[name]
+
+        return BarPanel(
+            dates=dates,
+            tickers=tickers,
+            fields={name: values.T for name, values in panel.items()},
+        )
+
+    async def update(self, provider, tickers: list[str]) -> dict[str, str]:
+        """
+        Fetch only the missing days of each ticker and append them.
+
+        Returns an error message for each ticker that could not be updated.
+        """
+        today = date.today()
+
+        async def update_ticker(ticker: str):
+            last = self.last_date(ticker)
+            if last is not None and last >= today:
+                return
+            since = last + timedelta(days=1) if last is not None else None
+            bars = await provider.get_daily_bars(ticker, since=since)
+            self.append(ticker, bars)
+
+        tickers = [ticker.upper() for ticker in tickers]
+        results = await asyncio.gather(
+            *(update_ticker(ticker) for ticker in tickers), return_exceptions=True
+        )
+        return {
+            ticker: str(result)
+            for ticker, result in zip(tickers, results)
+            if isinstance(result, Exception)
+        }
+
+    def _map_column(self, path: Path, dtype: np.dtype) -> np.ndarray:
+        try:
+            with open(path, "rb") as f:
+                rows = os.fstat(f.fileno()).st_size // dtype.itemsize
+                if rows == 0:
+                    return np.empty(0, dtype=dtype)
+                buffer = mmap.mmap(
+                    f.fileno(), rows * dtype.itemsize, access=mmap.ACCESS_READ
+                )
+        except FileNotFoundError:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(buffer, dtype=dtype)
+
+    def _write_column(self, path: Path, values: np.ndarray, offset: int):
+        # Truncate any torn tail left by a previous partial write, then append
+        with open(path, "ab") as f:
+            f.truncate(offset)
+            f.write(np.ascontiguousarray(values).tobytes())
+
+
+def _date_axis(dates: list[np.ndarray]) -> np.ndarray:
+    """
+    Union of sorted date arrays. Tickers mostly trade on the same days, so the
+    longest array is the calendar and only arrays with other days are merged.
+    """
+    dates = [column for column in dates if len(column)]
+    if not dates:
+        return np.empty(0, dtype=BAR_FIELDS["date"])
+    calendar = max(dates, key=len)
+    outside = [column for column in dates if _calendar_index(column, calendar) is None]
+    if outside:
+        return np.unique(np.concatenate([calendar, *outside]))
+    return calendar.copy()
+
+
+def _calendar_index(
+    dates: np.ndarray, calendar: np.ndarray
+) -> slice | np.ndarray | None:
+    """
+    Where non-empty sorted `dates` sit on `calendar`: a slice when they are a
+    contiguous run of it, their rows otherwise, None if a day is missing.
+    """
+    first = int(np.searchsorted(calendar, dates[0]))
+    run = slice(first, first + len(dates))
+    if np.array_equal(calendar[run], dates):
+        return run
+
+    rows = np.searchsorted(calendar, dates)
+    inside = rows < len(calendar)
+    if not inside.all() or not np.array_equal(calendar[rows], dates):
+        return None
+    return rows
@@ -1,26 +1,65 @@
 import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 
+@dataclass(frozen=True)
+class CachedPrice:
+    price: float
+    timestamp: float
+    source: str | None = None
+
+    @property
+    def fetched_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+
 class PriceCache:
-    def __init__(self, conn: sqlite3.Connection, ttl_seconds: float):
+    """
+    Two-tier price cache.
+
+    L1 is an in-process LRU of (price, timestamp, source) entries bounded to
+    `max_entries`. L2 is the `market_prices` SQLite table, written behind:
+    `set` only queues the row and the queue is flushed in a single transaction
+    once `flush_batch_size` rows are pending, or when `flush` is called.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        ttl_seconds: float,
+        max_entries: int = 1024,
+        flush_batch_size: int = 50,
+    ):
         self.conn = conn
         self.ttl = ttl_seconds
-        self._store: dict[str, tuple[float, float]] = {}
+        self.max_entries = max_entries
+        self.flush_batch_size = flush_batch_size
+        self._store: OrderedDict[str, CachedPrice] = OrderedDict()
+        self._pending: dict[str, CachedPrice] = {}
 
-    def get(self, ticker: str) -> float | None:
+    def get(self, ticker: str) -> CachedPrice | None:
         ticker = ticker.upper()
+
+        entry = self._get_memory(ticker)
+        if entry is not None:
+            return entry
+
         row = self.conn.execute(
-            "SELECT price, timestamp FROM market_prices WHERE ticker = ?", (ticker,)
+            "SELECT price, timestamp, source FROM market_prices WHERE ticker = ?",
+            (ticker,),
         ).fetchone()
 
         if row is None:
             return None
 
-        price, timestamp = row
-        timestamp = datetime.fromisoformat(timestamp)
-        age = (datetime.now(timezone.utc) - timestamp).total_seconds()
-        if age > self.ttl:
+        price, timestamp, source = row
+        entry = CachedPrice(
+            price, datetime.fromisoformat(timestamp).timestamp(), source
+        )
+        if self._is_expired(entry.timestamp):
             self.conn.execute(
                 "DELETE FROM market_prices WHERE ticker = ?",
                 (ticker,),
@@ -28,23 +67,105 @@ class PriceCache:
             self.conn.commit()
             return None
 
-        return price
+        self._remember(ticker, entry)
+        return entry
+
+    def get_many(self, tickers: list[str]) -> dict[str, CachedPrice]:
+        """
+        Resolve several tickers, reading every L1 miss with a single query.
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+
+        prices = {}
+        misses = []
+        for ticker in tickers:
+            entry = self._get_memory(ticker)
+            if entry is None:
+                misses.append(ticker)
+            else:
+                prices[ticker] = entry
+
+        if not misses:
+            return prices
+
+        placeholders = ",".join("?" for _ in misses)
+        rows = self.conn.execute(
+            f"SELECT ticker, price, timestamp, source FROM market_prices "
+            f"WHERE ticker IN ({placeholders})",
+            misses,
+        ).fetchall()
+
+        expired = []
+        for ticker, price, timestamp, source in rows:
+            entry = CachedPrice(
+                price, datetime.fromisoformat(timestamp).timestamp(), source
+            )
+            if self._is_expired(entry.timestamp):
+                expired.append((ticker,))
+                continue
+            self._remember(ticker, entry)
+            prices[ticker] = entry
+
+        if expired:
+            self.conn.executemany(
+                "DELETE FROM market_prices WHERE ticker = ?",
+                expired,
+            )
+            self.conn.commit()
+
+        return prices
 
-    def set(self, ticker: str, price: float):
+    def set(self, ticker: str, price: float, source: str | None = None):
         ticker = ticker.upper()
+        entry = CachedPrice(price, time.time(), source)
 
-        self.conn.execute(
-            """
-            INSERT INTO market_prices (ticker, price, timestamp)
-            VALUES (?, ?, ?)
-            ON CONFLICT(ticker) DO UPDATE SET
-                price = excluded.price,
-                timestamp = excluded.timestamp
-            """,
-            (
-                ticker,
-                price,
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
-        self.conn.commit()
+        self._remember(ticker, entry)
+        self._pending[ticker] = entry
+        if len(self._pending) >= self.flush_batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write every pending entry to SQLite in one transaction.
+        """
+        if not self._pending:
+            return
+
+        rows = [
+            (ticker, entry.price, entry.fetched_at.isoformat(), entry.source)
+            for ticker, entry in self._pending.items()
+        ]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO market_prices (ticker, price, timestamp, source)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    price = excluded.price,
+                    timestamp = excluded.timestamp,
+                    source = excluded.source
+                """,
+                rows,
+            )
+        self._pending.clear()
+
+    def _get_memory(self, ticker: str) -> CachedPrice | None:
+        entry = self._store.get(ticker) or self._pending.get(ticker)
+        if entry is None:
+            return None
+
+        if self._is_expired(entry.timestamp):
+            self._store.pop(ticker, None)
+            return None
+
+        self._remember(ticker, entry)
+        return entry
+
+    def _remember(self, ticker: str, entry: CachedPrice):
+        self._store[ticker] = entry
+        self._store.move_to_end(ticker)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def _is_expired(self, timestamp: float) -> bool:
+        return time.time() - timestamp > self.ttl
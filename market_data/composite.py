@@ -0,0 +1,328 @@
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+
+import numpy as np
+
+from concurrency.single_flight import SingleFlightStats
+from market_data.bars import Bars
+from market_data.cache import PriceCache
+from market_data.models import MarketQuote, MarketQuoteBatch
+from market_data.provider import MarketDataProvider
+from market_data.snapshot import QuoteSnapshot
+from observability.metrics import metrics
+from persistence.database import get_connection
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    """
+    A backup request goes out once the primary has been pending longer than
+    the `quantile` of its recent latencies, clamped to `min_delay` and
+    `max_delay`. Until `min_samples` latencies are known `initial_delay` is
+    used instead.
+    """
+
+    quantile: float = 0.9
+    min_samples: int = 5
+    initial_delay: float = 2.0
+    min_delay: float = 0.25
+    max_delay: float = 15.0
+
+
+class LatencyTracker:
+    """
+    Latencies of the most recent successful requests to one backend.
+    """
+
+    def __init__(self, window: int = 100):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 1) -> float | None:
+        if len(self._samples) < min_samples:
+            return None
+        return float(np.quantile(np.fromiter(self._samples, dtype=float), q))
+
+
+class HedgedMarketDataProvider:
+    """
+    Quotes from several market data providers at once.
+
+    Cache misses are routed to the backend with the most quota left. A request
+    still pending after the hedge delay is sent again to the backup backend,
+    and each ticker takes whichever answer arrives first. The delay only
+    starts once the primary holds its rate limiter token, a request queued
+    in its own limiter is not slow. Tickers the primary fails on are sent to
+    the backup right away. Every quote keeps the
+    `source` of the backend that actually priced it.
+    """
+
+    def __init__(
+        self,
+        backends: list[MarketDataProvider],
+        config: HedgeConfig | None = None,
+    ):
+        if len(backends) < 2:
+            raise ValueError("Hedging needs at least two market data providers.")
+
+        self.backends = backends
+        self.config = config or HedgeConfig()
+        self._latency = {backend.name: LatencyTracker() for backend in backends}
+
+    async def get_market_quotes(self, tickers: List[str]) -> dict[str, MarketQuote]:
+        batch = await self.get_market_quotes_batch(tickers)
+        return batch.quotes
+
+    async def get_market_quotes_batch(self, tickers: List[str]) -> MarketQuoteBatch:
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        # The backends share one price cache, any of them can read it
+        batch = self.backends[0].cached_quotes(tickers)
+
+        misses = [ticker for ticker in tickers if ticker not in batch.quotes]
+        if misses:
+            fetched = await self._fetch_misses(misses)
+            batch.quotes.update(fetched.quotes)
+            batch.errors.update(fetched.errors)
+        return batch
+
+    async def get_quote_snapshot(self, tickers: List[str]) -> QuoteSnapshot:
+        snapshot = QuoteSnapshot(tickers)
+        cached = self.backends[0].cached_prices(snapshot.tickers)
+        snapshot.fill_cached(cached)
+
+        misses = [ticker for ticker in snapshot.tickers if ticker not in cached]
+        if misses:
+            snapshot.fill(await self._fetch_misses(misses))
+        return snapshot
+
+    async def _fetch_misses(self, misses: List[str]) -> MarketQuoteBatch:
+        batch = MarketQuoteBatch()
+        requests = []
+        for backend, routed in self._route(misses).items():
+            if not routed:
+                continue
+            if backend.supports_batch:
+                requests.append(self._hedged(backend, routed))
+            else:
+                requests.extend(self._hedged(backend, [ticker]) for ticker in routed)
+
+        for fetched in await asyncio.gather(*requests):
+            batch.quotes.update(fetched.quotes)
+            batch.errors.update(fetched.errors)
+        return batch
+
+    async def get_daily_bars(self, ticker: str, since: date | None = None) -> Bars:
+        """
+        Fetch daily bars from the backend with the most quota left, falling
+        back to the others in turn. Bar requests are large, so they are not
+        hedged.
+        """
+        backends = sorted(
+            self.backends, key=lambda backend: backend.remaining_quota(), reverse=True
+        )
+        for backend in backends[:-1]:
+            try:
+                return await backend.get_daily_bars(ticker, since=since)
+            except Exception:
+                metrics.inc(
+                    "market_data_failovers_total", provider=backend.name, kind="bars"
+                )
+        return await backends[-1].get_daily_bars(ticker, since=since)
+
+    def coalescing_stats(self) -> SingleFlightStats:
+        stats = SingleFlightStats()
+        for backend in self.backends:
+            backend_stats = backend.coalescing_stats()
+            stats.calls += backend_stats.calls
+            stats.coalesced += backend_stats.coalesced
+        return stats
+
+    async def close(self):
+        for backend in self.backends:
+            await backend.close()
+
+    def _route(self, tickers: List[str]) -> dict[MarketDataProvider, List[str]]:
+        """
+        Assign each ticker to the backend left with the most credits after
+        quoting it, which spreads a large batch across both quotas.
+        """
+        quota = {backend: backend.remaining_quota() for backend in self.backends}
+        routes: dict[MarketDataProvider, List[str]] = {
+            backend: [] for backend in self.backends
+        }
+
+        def left_after(backend: MarketDataProvider) -> float:
+            return quota[backend] - backend.request_cost(len(routes[backend]) + 1)
+
+        for ticker in tickers:
+            routes[max(self.backends, key=left_after)].append(ticker)
+        return routes
+
+    def _backup_for(
+        self, primary: MarketDataProvider, tickers: List[str]
+    ) -> MarketDataProvider | None:
+        cost = {
+            backend: backend.request_cost(len(tickers))
+            for backend in self.backends
+            if backend is not primary
+        }
+        candidates = [
+            backend for backend in cost if backend.remaining_quota() >= cost[backend]
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda backend: backend.remaining_quota())
+
+    def _hedge_delay(self, backend: MarketDataProvider) -> float:
+        config = self.config
+        delay = self._latency[backend.name].quantile(
+            config.quantile, min_samples=config.min_samples
+        )
+        if delay is None:
+            return config.initial_delay
+        return min(max(delay, config.min_delay), config.max_delay)
+
+    async def _hedged(
+        self, primary: MarketDataProvider, tickers: List[str]
+    ) -> MarketQuoteBatch:
+        batch = MarketQuoteBatch()
+        unresolved = set(tickers)
+        granted = asyncio.Event()
+        granting = asyncio.ensure_future(granted.wait())
+        tasks = {asyncio.ensure_future(self._fetch(primary, tickers, granted)): primary}
+        hedged = False
+
+        def hedge(reason: str):
+            nonlocal hedged
+            hedged = True
+            backup = self._backup_for(primary, sorted(unresolved))
+            if backup is None:
+                return
+            metrics.inc("market_data_hedges_total", provider=backup.name, reason=reason)
+            tasks[asyncio.ensure_future(self._fetch(backup, sorted(unresolved)))] = (
+                backup
+            )
+
+        try:
+            while tasks and unresolved:
+                if not granted.is_set():
+                    # No hedge delay while the primary waits for its token
+                    done, _ = await asyncio.wait(
+                        [*tasks, granting], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    done.discard(granting)
+                    if not done:
+                        continue
+                else:
+                    done, _ = await asyncio.wait(
+                        tasks,
+                        timeout=None if hedged else self._hedge_delay(primary),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not done:
+                        hedge("slow")
+                        continue
+
+                for task in done:
+                    backend = tasks.pop(task)
+                    fetched = task.result()
+                    for ticker, quote in fetched.quotes.items():
+                        if ticker not in unresolved:
+                            continue
+                        unresolved.discard(ticker)
+                        batch.quotes[ticker] = quote
+                        metrics.inc(
+                            "market_data_quotes_total",
+                            provider=backend.name,
+                            role="primary" if backend is primary else "backup",
+                        )
+                    for ticker, error in fetched.errors.items():
+                        if ticker in unresolved:
+                            batch.errors[ticker] = f"{backend.name}: {error}"
+
+                if unresolved and not hedged:
+                    hedge("failover")
+        finally:
+            # A losing request still waiting for its token is dropped, one
+            # that already spent its credit keeps running under its single
+            # flight and still refreshes the cache
+            granting.cancel()
+            for task in tasks:
+                task.cancel()
+
+        for ticker in batch.quotes:
+            batch.errors.pop(ticker, None)
+        return batch
+
+    async def _fetch(
+        self,
+        backend: MarketDataProvider,
+        tickers: List[str],
+        granted: asyncio.Event | None = None,
+    ) -> MarketQuoteBatch:
+        """
+        Fetch from one backend. The latency is timed from when its requests
+        hold their rate limiter tokens, and `granted` is set at that point.
+        """
+        started = None
+
+        def on_granted():
+            nonlocal started
+            started = time.monotonic()
+            if granted is not None:
+                granted.set()
+
+        try:
+            batch = await backend.fetch_market_quotes(tickers, on_granted=on_granted)
+        except Exception as e:
+            return MarketQuoteBatch(errors={ticker: str(e) for ticker in tickers})
+
+        if batch.quotes and started is not None:
+            elapsed = time.monotonic() - started
+            self._latency[backend.name].record(elapsed)
+            metrics.observe(
+                "market_data_request_seconds", elapsed, provider=backend.name
+            )
+        return batch
+
+
+def create_market_data_provider(
+    provider: str | None = None,
+) -> MarketDataProvider | HedgedMarketDataProvider:
+    """
+    Build the provider named by `provider` or `MARKET_DATA_PROVIDER`:
+    `alpha_vantage`, `twelve_data`, `hedged`, or `auto` (the default), which
+    hedges across both when both API keys are set.
+    """
+    provider = (provider or os.getenv("MARKET_DATA_PROVIDER", "auto")).lower()
+    has_alpha_vantage = bool(os.getenv("ALPHA_VANTAGE_API_KEY"))
+    has_twelve_data = bool(os.getenv("TWELVE_DATA_API_KEY"))
+
+    if provider == "auto":
+        if has_alpha_vantage and has_twelve_data:
+            provider = "hedged"
+        elif has_twelve_data:
+            provider = "twelve_data"
+        else:
+            provider = "alpha_vantage"
+
+    if provider != "hedged":
+        return MarketDataProvider(provider=provider)
+
+    cache = PriceCache(conn=get_connection(), ttl_seconds=3600 * 12)
+    return HedgedMarketDataProvider(
+        backends=[
+            MarketDataProvider(provider="alpha_vantage", cache=cache),
+            MarketDataProvider(provider="twelve_data", cache=cache),
+        ],
+        config=HedgeConfig(
+            quantile=float(os.getenv("MARKET_DATA_HEDGE_QUANTILE", "0.9")),
+        ),
+    )
@@ -0,0 +1,200 @@
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from market_data.bars import BarPanel
+
+INDICATORS = (
+    "momentum",
+    "volatility",
+    "atr",
+    "atr_pct",
+    "drawdown",
+    "volume_zscore",
+    "gap",
+)
+
+
+@dataclass(frozen=True)
+class IndicatorConfig:
+    momentum_window: int = 20
+    volatility_window: int = 20
+    atr_window: int = 14
+    volume_window: int = 20
+    gap_threshold: float = 0.03
+    trading_days: int = 252
+
+    @property
+    def lookback(self) -> int:
+        """
+        Rows of history needed to compute every rolling indicator.
+        """
+        return max(self.momentum_window, self.volatility_window, self.volume_window) + 1
+
+
+@dataclass(frozen=True)
+class IndicatorMatrix:
+    """
+    Latest indicator values for every ticker, one array per indicator.
+    """
+
+    date: np.datetime64
+    tickers: list[str]
+    values: dict[str, np.ndarray]
+    gap_threshold: float
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    @property
+    def gaps(self) -> np.ndarray:
+        return np.abs(np.nan_to_num(self.values["gap"])) >= self.gap_threshold
+
+    def row(self, ticker: str) -> dict[str, float]:
+        column = self.tickers.index(ticker.upper())
+        return {name: float(values[column]) for name, values in self.values.items()}
+
+
+class IndicatorEngine:
+    """
+    Vectorized technical indicators over a whole bar panel.
+
+    The engine keeps only the tail of the panel needed by the rolling windows
+    plus the running ATR and peak close, so a new bar updates every ticker in
+    O(lookback) instead of recomputing the full history.
+    """
+
+    def __init__(self, panel: BarPanel, config: IndicatorConfig | None = None):
+        self.config = config = config or IndicatorConfig()
+        self.tickers = list(panel.tickers)
+        self.date = panel.dates[-1] if len(panel.dates) else None
+
+        close = panel["close"]
+        tail = config.lookback
+        self._open = panel["open"][-tail:].copy()
+        self._high = panel["high"][-tail:].copy()
+        self._low = panel["low"][-tail:].copy()
+        self._close = close[-tail:].copy()
+        self._volume = panel["volume"][-tail:].copy()
+
+        self._peak = (
+            np.fmax.reduce(close, axis=0)
+            if len(close)
+            else np.full(len(self.tickers), np.nan)
+        )
+        self._atr = np.full(len(self.tickers), np.nan)
+        previous_close = np.full(len(self.tickers), np.nan)
+        for high, low, close_row in zip(panel["high"], panel["low"], close):
+            self._update_atr(high, low, previous_close)
+            previous_close = np.where(np.isnan(close_row), previous_close, close_row)
+
+    def update(
+        self,
+        date: np.datetime64,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ) -> IndicatorMatrix:
+        """
+        Add one bar per ticker (aligned with `tickers`) and return the new matrix.
+        """
+        self._update_atr(high, low, self._last_close())
+        self._peak = np.fmax(self._peak, close)
+
+        lookback = self.config.lookback
+        for name, row in (
+            ("_open", open),
+            ("_high", high),
+            ("_low", low),
+            ("_close", close),
+            ("_volume", volume),
+        ):
+            tail = np.vstack([getattr(self, name), np.asarray(row, dtype=np.float64)])
+            setattr(self, name, tail[-lookback:])
+
+        self.date = np.datetime64(date, "D")
+        return self.compute()
+
+    def compute(self) -> IndicatorMatrix:
+        config = self.config
+        close = self._close
+        if len(close) == 0:
+            empty = np.full(len(self.tickers), np.nan)
+            return IndicatorMatrix(
+                date=self.date,
+                tickers=self.tickers,
+                values={name: empty.copy() for name in INDICATORS},
+                gap_threshold=config.gap_threshold,
+            )
+        last_close = close[-1]
+
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            momentum = self._pct_change(close, config.momentum_window)
+
+            start = -(config.volatility_window + 1)
+            returns = np.diff(np.log(close[start:]), axis=0)
+            volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(
+                config.trading_days
+            )
+
+            start = -(config.volume_window + 1)
+            history = self._volume[start:-1]
+            volume_zscore = (self._volume[-1] - np.nanmean(history, axis=0)) / (
+                np.nanstd(history, axis=0, ddof=1)
+            )
+
+            gap = self._open[-1] / close[-2] - 1 if len(close) > 1 else np.nan
+            gap = np.broadcast_to(gap, (len(self.tickers),)).astype(np.float64)
+
+            values = {
+                "momentum": momentum,
+                "volatility": volatility,
+                "atr": self._atr.copy(),
+                "atr_pct": self._atr / last_close,
+                "drawdown": last_close / self._peak - 1,
+                "volume_zscore": volume_zscore,
+                "gap": gap,
+            }
+
+        return IndicatorMatrix(
+            date=self.date,
+            tickers=self.tickers,
+            values={
+                name: np.where(np.isfinite(value), value, np.nan)
+                for name, value in values.items()
+            },
+            gap_threshold=config.gap_threshold,
+        )
+
+    def _pct_change(self, close: np.ndarray, window: int) -> np.ndarray:
+        if len(close) <= window:
+            return np.full(len(self.tickers), np.nan)
+        return close[-1] / close[-1 - window] - 1
+
+    def _last_close(self) -> np.ndarray:
+        if len(self._close) == 0:
+            return np.full(len(self.tickers), np.nan)
+        return self._close[-1]
+
+    def _update_atr(
+        self, high: np.ndarray, low: np.ndarray, previous_close: np.ndarray
+    ):
+        """
+        Wilder smoothing of the true range, seeded with the first true range.
+        """
+        true_range = np.fmax(
+            high - low,
+            np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)),
+        )
+        window = self.config.atr_window
+        smoothed = (self._atr * (window - 1) + true_range) / window
+        self._atr = np.where(
+            np.isnan(self._atr),
+            true_range,
+            np.where(np.isnan(true_range), self._atr, smoothed),
+        )
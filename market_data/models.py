@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class MarketQuote(BaseModel):
@@ -8,3 +8,12 @@ class MarketQuote(BaseModel):
     price: float
     timestamp: datetime
     source: str = "alpha_vantage"
+
+
+class MarketQuoteBatch(BaseModel):
+    quotes: dict[str, MarketQuote] = Field(
+        default_factory=dict, description="Quotes resolved, keyed by ticker"
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict, description="Error message for each failed ticker"
+    )
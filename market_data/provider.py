@@ -1,50 +1,98 @@
+import asyncio
 import os
-from datetime import datetime, timezone
-from typing import List
+from datetime import date, datetime, timezone
+from functools import partial
+from itertools import batched
+from typing import Awaitable, Callable, Hashable, List, TypeVar
 
 import httpx
 
-from market_data.cache import PriceCache
-from market_data.models import MarketQuote
-from market_data.rate_limiter import RateLimiter
+from concurrency.rate_limiter import QuotaExhaustedError
+from concurrency.resilience import ProviderThrottledError, provider_resilience
+from concurrency.single_flight import SingleFlight, SingleFlightStats
+from market_data.bars import Bars
+from market_data.cache import CachedPrice, PriceCache
+from market_data.models import MarketQuote, MarketQuoteBatch
+from market_data.rate_limiter import provider_rate_limiter
+from market_data.snapshot import QuoteSnapshot
+from observability.metrics import http_event_hooks
 from persistence.database import get_connection
 
+T = TypeVar("T")
+
 
 class MarketDataProvider:
-    def __init__(self, provider: str = "alpha_vantage"):
+    def __init__(
+        self, provider: str = "alpha_vantage", cache: PriceCache | None = None
+    ):
         self._provider = provider.lower()
 
         if provider == "alpha_vantage":
             self._base_url = os.getenv(
                 "ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query"
             )
+            self._time_series_url = self._base_url
             self._api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-            min_interval = float(os.getenv("ALPHA_VANTAGE_MIN_INTERVAL", "12.0"))
             self._get_quote_function = self._get_alpha_vantage_quote
         else:
             self._base_url = os.getenv(
                 "TWELVE_DATA_BASE_URL", "https://api.twelvedata.com/quote"
             )
+            self._time_series_url = os.getenv(
+                "TWELVE_DATA_TIME_SERIES_URL", "https://api.twelvedata.com/time_series"
+            )
             self._api_key = os.getenv("TWELVE_DATA_API_KEY")
-            min_interval = 1
+            # Symbols per quote request, the API accepts up to 120. Each
+            # symbol costs a credit, so chunks are also capped by the quota
+            self._batch_size = int(os.getenv("TWELVE_DATA_BATCH_SIZE", "120"))
 
         if not self._api_key:
             raise ValueError("Market data provider API key is not set.")
-        self._limiter = RateLimiter(min_interval)
-        self._cache = PriceCache(
+        self._limiter = provider_rate_limiter(self._provider)
+        self._cache = cache or PriceCache(
             conn=get_connection(), ttl_seconds=3600 * 12
         )  # Cache for 12 hours
-        self._client = httpx.AsyncClient(timeout=10.0)
+        self._client = httpx.AsyncClient(timeout=10.0, event_hooks=http_event_hooks())
+        # A quote request every caller has given up on is dropped while it
+        # still waits for its rate limiter token
+        self._flight = SingleFlight(cancel_abandoned=True)
+        self._granted: dict[Hashable, asyncio.Future] = {}
+        self._resilience = provider_resilience(self._provider)
+
+    async def _request(
+        self, url: str, params: dict, credits: int = 1, prepaid: bool = False
+    ) -> dict:
+        """
+        GET a provider endpoint under its rate limiter, retrying transient
+        failures and throttle payloads behind the provider's circuit breaker.
+        `credits` is what the request costs against the quota, with `prepaid`
+        they were already acquired for the first attempt.
+        """
+
+        async def attempt():
+            nonlocal prepaid
+            # Rate limiting, every retry is charged against the quota again
+            if prepaid:
+                prepaid = False
+            else:
+                await self._limiter.acquire(credits)
+            response = await self._client.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            _raise_for_throttle(data)
+            return data
+
+        return await self._resilience.call(attempt)
 
-    async def _get_alpha_vantage_quote(self, ticker: str) -> MarketQuote:
+    async def _get_alpha_vantage_quote(
+        self, ticker: str, prepaid: bool = False
+    ) -> MarketQuote:
         params = {
             "function": "GLOBAL_QUOTE",
             "symbol": ticker,
             "apikey": self._api_key,
         }
-        response = await self._client.get(self._base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await self._request(self._base_url, params, prepaid=prepaid)
 
         quote = data.get("Global Quote", {})
         if not quote or "05. price" not in quote:
@@ -58,66 +106,347 @@ class MarketDataProvider:
             source="alpha_vantage",
         )
 
-    async def _get_twelve_data_quotes(self, tickers: List[str]) -> List[MarketQuote]:
+    async def _get_twelve_data_quotes(
+        self, tickers: List[str], prepaid: bool = False
+    ) -> MarketQuoteBatch:
         params = {
             "symbol": ",".join(tickers),
             "apikey": self._api_key,
         }
-        response = await self._client.get(self._base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await self._request(
+            self._base_url, params, credits=len(tickers), prepaid=prepaid
+        )
+
+        # One symbol comes back as a flat payload, several are keyed by symbol
+        if len(tickers) == 1:
+            data = {tickers[0]: data}
 
-        quotes = {}
+        batch = MarketQuoteBatch()
         now = datetime.now(timezone.utc)
         for ticker in tickers:
-            payload = data.get(ticker)
+            payload = data.get(ticker) or {}
+            price = payload.get("price") or payload.get("close")
 
-            if not payload or "price" not in payload:
-                raise ValueError(f"No market data found for ticker {ticker}: {data}")
+            if payload.get("status") == "error" or price is None:
+                batch.errors[ticker] = (
+                    f"No market data found for ticker {ticker}: "
+                    f"{payload.get('message') or payload}"
+                )
+                continue
 
-            quotes[ticker] = MarketQuote(
+            batch.quotes[ticker] = MarketQuote(
                 ticker=ticker,
-                price=float(payload["price"]),
+                price=float(price),
                 timestamp=now,
                 source="twelve_data",
             )
-        return quotes
+        return batch
 
-    async def get_market_quotes(self, tickers: List[str]) -> dict[MarketQuote]:
-        quotes = {}
-        for ticker in tickers:
-            ticker = ticker.upper()
-
-            # Cache check
-            cached_price = self._cache.get(ticker)
-            if cached_price is not None:
-                quotes[ticker] = MarketQuote(
-                    ticker=ticker,
-                    price=cached_price,
-                    timestamp=datetime.now(timezone.utc),
-                )
-                continue
+    async def get_market_quotes(self, tickers: List[str]) -> dict[str, MarketQuote]:
+        batch = await self.get_market_quotes_batch(tickers)
+        return batch.quotes
+
+    async def get_market_quotes_batch(self, tickers: List[str]) -> MarketQuoteBatch:
+        """
+        Resolve quotes for many tickers at once.
 
-            # Rate limiting
-            await self._limiter.acquire()
+        Cache hits are read with a single query, misses are fetched concurrently
+        (each one still waiting on the rate limiter) and failures are reported
+        per ticker instead of aborting the whole batch.
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        batch = self.cached_quotes(tickers)
 
-            # Alpha Vantage get one ticker at a time
-            if self._provider == "alpha_vantage":
-                quote = await self._get_alpha_vantage_quote(ticker)
+        misses = [ticker for ticker in tickers if ticker not in batch.quotes]
+        if not misses:
+            return batch
 
-                # Cache result
-                self._cache.set(ticker, quote.price)
+        fetched = await self.fetch_market_quotes(misses)
+        batch.quotes.update(fetched.quotes)
+        batch.errors.update(fetched.errors)
+        return batch
 
-                quotes[ticker] = quote
+    async def get_quote_snapshot(self, tickers: List[str]) -> QuoteSnapshot:
+        """
+        Resolve quotes like `get_market_quotes_batch`, into a QuoteSnapshot.
+        Cache hits go straight into the snapshot's array.
+        """
+        snapshot = QuoteSnapshot(tickers)
+        cached = self.cached_prices(snapshot.tickers)
+        snapshot.fill_cached(cached)
 
+        misses = [ticker for ticker in snapshot.tickers if ticker not in cached]
+        if misses:
+            snapshot.fill(await self.fetch_market_quotes(misses))
+        return snapshot
+
+    def cached_prices(self, tickers: List[str]) -> dict[str, CachedPrice]:
+        """
+        Prices still fresh in the price cache, read with a single query.
+        """
+        return self._cache.get_many(tickers)
+
+    def cached_quotes(self, tickers: List[str]) -> MarketQuoteBatch:
+        batch = MarketQuoteBatch()
+        for ticker, cached in self.cached_prices(tickers).items():
+            batch.quotes[ticker] = MarketQuote(
+                ticker=ticker,
+                price=cached.price,
+                timestamp=cached.fetched_at,
+                source=cached.source or "unknown",
+            )
+        return batch
+
+    async def fetch_market_quotes(
+        self, misses: List[str], on_granted: Callable[[], None] | None = None
+    ) -> MarketQuoteBatch:
+        """
+        Fetch quotes from the provider without checking the cache first.
+
+        `on_granted` is called once no request for `misses` is still waiting
+        for its rate limiter token.
+        """
+        batch = MarketQuoteBatch()
+
+        # Alpha Vantage get one ticker at a time
+        if self._provider == "alpha_vantage":
+            granted = _countdown(len(misses), on_granted)
+            results = await asyncio.gather(
+                *(
+                    self._flight_request(
+                        ticker,
+                        partial(self._fetch_alpha_vantage_quote, ticker),
+                        credits=1,
+                        on_granted=granted,
+                    )
+                    for ticker in misses
+                ),
+                return_exceptions=True,
+            )
+            for ticker, result in zip(misses, results):
+                if isinstance(result, Exception):
+                    batch.errors[ticker] = str(result)
+                    continue
+                batch.quotes[ticker] = result
+
+        # Twelve Data takes many tickers per request, chunks go out concurrently
         if self._provider == "twelve_data":
-            quotes = await self._get_twelve_data_quotes(tickers)
-            for quote in quotes.values():
-                if isinstance(quote, Exception):
+            chunks = list(batched(misses, self._chunk_size()))
+            granted = _countdown(len(chunks), on_granted)
+            results = await asyncio.gather(
+                *(
+                    self._flight_request(
+                        chunk,
+                        partial(self._fetch_twelve_data_quotes, list(chunk)),
+                        credits=len(chunk),
+                        on_granted=granted,
+                    )
+                    for chunk in chunks
+                ),
+                return_exceptions=True,
+            )
+            for chunk, result in zip(chunks, results):
+                if isinstance(result, Exception):
+                    batch.errors.update({ticker: str(result) for ticker in chunk})
                     continue
-                # Cache result
-                self._cache.set(quote.ticker, quote.price)
-        return quotes
+                batch.quotes.update(result.quotes)
+                batch.errors.update(result.errors)
+
+        return batch
+
+    async def _flight_request(
+        self,
+        key: Hashable,
+        fetch: Callable[..., Awaitable[T]],
+        credits: int,
+        on_granted: Callable[[], None],
+    ) -> T:
+        """
+        Share one quote request per key. The request waits for its rate
+        limiter token first and is dropped there once every caller has given
+        up on it. After that the credit is spent, so it runs to the end and
+        refreshes the cache. `on_granted` is called once it holds its token
+        or has failed without one.
+        """
+        granted = self._granted.get(key)
+        if granted is None:
+            granted = self._granted[key] = asyncio.get_running_loop().create_future()
+        granted.add_done_callback(lambda _: on_granted())
+
+        async def request() -> T:
+            try:
+                await self._limiter.acquire(credits)
+                granted.set_result(None)
+                return await asyncio.shield(fetch(prepaid=True))
+            finally:
+                granted.cancel()
+                if self._granted.get(key) is granted:
+                    del self._granted[key]
+
+        return await self._flight.do(key, request)
+
+    def coalescing_stats(self) -> SingleFlightStats:
+        return self._flight.stats()
+
+    @property
+    def name(self) -> str:
+        return self._provider
+
+    @property
+    def supports_batch(self) -> bool:
+        """
+        Whether one request can quote several tickers.
+        """
+        return self._provider == "twelve_data"
+
+    def remaining_quota(self) -> float:
+        """
+        Credits left in the provider's tightest quota window.
+        """
+        return min(self._limiter.remaining().values())
+
+    def request_cost(self, tickers: int) -> int:
+        """
+        Credits needed to quote `tickers` tickers that are not cached. Both
+        providers charge one per symbol, batched or not.
+        """
+        return tickers
+
+    def _chunk_size(self) -> int:
+        """
+        Symbols per Twelve Data quote request: the configured batch size, but
+        never more credits than the smallest quota window can ever grant.
+        """
+        capacity = min(window.capacity for window in self._limiter.windows)
+        return max(1, min(self._batch_size, int(capacity)))
+
+    async def _fetch_alpha_vantage_quote(
+        self, ticker: str, prepaid: bool = False
+    ) -> MarketQuote:
+        quote = await self._get_alpha_vantage_quote(ticker, prepaid=prepaid)
+
+        # Cache result
+        self._cache.set(ticker, quote.price, quote.source)
+        return quote
+
+    async def _fetch_twelve_data_quotes(
+        self, tickers: List[str], prepaid: bool = False
+    ) -> MarketQuoteBatch:
+        batch = await self._get_twelve_data_quotes(tickers, prepaid=prepaid)
+
+        for quote in batch.quotes.values():
+            # Cache result
+            self._cache.set(quote.ticker, quote.price, quote.source)
+        return batch
+
+    async def get_daily_bars(self, ticker: str, since: date | None = None) -> Bars:
+        """
+        Fetch daily OHLCV bars for a ticker, starting at `since` when given.
+        """
+        ticker = ticker.upper()
+
+        if self._provider == "alpha_vantage":
+            return await self._get_alpha_vantage_bars(ticker, since)
+        return await self._get_twelve_data_bars(ticker, since)
+
+    async def _get_alpha_vantage_bars(self, ticker: str, since: date | None) -> Bars:
+        # The compact output only covers the latest 100 trading days
+        compact = since is not None and (date.today() - since).days < 100
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": ticker,
+            "outputsize": "compact" if compact else "full",
+            "apikey": self._api_key,
+        }
+        data = await self._request(self._time_series_url, params)
+
+        series = data.get("Time Series (Daily)")
+        if not series:
+            raise ValueError(f"No daily bars found for ticker {ticker}: {data}")
+
+        dates = sorted(
+            day for day in series if since is None or day >= since.isoformat()
+        )
+        return Bars.from_records(
+            dates,
+            [
+                (
+                    float(series[day]["1. open"]),
+                    float(series[day]["2. high"]),
+                    float(series[day]["3. low"]),
+                    float(series[day]["4. close"]),
+                    float(series[day]["5. volume"]),
+                )
+                for day in dates
+            ],
+        )
+
+    async def _get_twelve_data_bars(self, ticker: str, since: date | None) -> Bars:
+        params = {
+            "symbol": ticker,
+            "interval": "1day",
+            "outputsize": 5000,
+            "order": "asc",
+            "apikey": self._api_key,
+        }
+        if since is not None:
+            params["start_date"] = since.isoformat()
+        data = await self._request(self._time_series_url, params)
+
+        values = data.get("values")
+        if data.get("status") == "error" or values is None:
+            raise ValueError(f"No daily bars found for ticker {ticker}: {data}")
+
+        return Bars.from_records(
+            [value["datetime"][:10] for value in values],
+            [
+                (
+                    float(value["open"]),
+                    float(value["high"]),
+                    float(value["low"]),
+                    float(value["close"]),
+                    float(value.get("volume") or 0.0),
+                )
+                for value in values
+            ],
+        )
 
     async def close(self):
+        self._cache.flush()
         await self._client.aclose()
+
+
+def _countdown(count: int, done: Callable[[], None] | None) -> Callable[[], None]:
+    """
+    A callback that calls `done` on its `count`-th call.
+    """
+
+    def tick():
+        nonlocal count
+        count -= 1
+        if count == 0 and done is not None:
+            done()
+
+    return tick
+
+
+def _raise_for_throttle(data: dict):
+    """
+    Both providers signal throttling with HTTP 200 and a message payload.
+    Per-minute limits clear up soon and are retried; a daily cap is not.
+    """
+    # Alpha Vantage: {"Note": "...API call frequency..."} or {"Information": ...}
+    message = data.get("Note") or data.get("Information")
+    if message and len(data) == 1:
+        text = message.lower()
+        if "per minute" in text or "frequency" in text:
+            raise ProviderThrottledError(f"Alpha Vantage throttled: {message}", 60.0)
+        if "per day" in text or "daily" in text:
+            raise QuotaExhaustedError(f"Alpha Vantage daily limit reached: {message}")
+
+    # Twelve Data: {"status": "error", "code": 429, "message": "...credits..."}
+    if data.get("status") == "error" and data.get("code") == 429:
+        message = data.get("message") or ""
+        if "for the day" in message.lower():
+            raise QuotaExhaustedError(f"Twelve Data daily limit reached: {message}")
+        raise ProviderThrottledError(f"Twelve Data throttled: {message}", 60.0)
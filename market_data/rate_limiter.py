@@ -1,16 +1,43 @@
-import asyncio
-import time
+import os
 
+from concurrency.rate_limiter import RateLimiter, RateWindow
 
-class RateLimiter:
-    def __init__(self, min_interval: float):
-        self.min_interval = min_interval
-        self._lock = asyncio.Lock()
-        self._last_call = 0.0
 
-    async def acquire(self):
-        async with self._lock:
-            elapsed = time.monotonic() - self._last_call
-            if elapsed < self.min_interval:
-                await asyncio.sleep(self.min_interval - elapsed)
-            self._last_call = time.monotonic()
+def provider_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Build the shared quota limiter for a market data provider.
+    """
+    if provider == "alpha_vantage":
+        windows = [
+            RateWindow(
+                name="minute",
+                limit=int(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_MINUTE", "5")),
+                period=60.0,
+                burst=int(os.getenv("ALPHA_VANTAGE_BURST", "1")),
+            ),
+            RateWindow(
+                name="day",
+                limit=int(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_DAY", "25")),
+                period=86400.0,
+            ),
+        ]
+    else:
+        windows = [
+            RateWindow(
+                name="minute",
+                limit=int(os.getenv("TWELVE_DATA_REQUESTS_PER_MINUTE", "8")),
+                period=60.0,
+                burst=int(os.getenv("TWELVE_DATA_BURST", "8")),
+            ),
+            RateWindow(
+                name="day",
+                limit=int(os.getenv("TWELVE_DATA_REQUESTS_PER_DAY", "800")),
+                period=86400.0,
+            ),
+        ]
+
+    return RateLimiter(
+        name=provider,
+        windows=windows,
+        max_wait=float(os.getenv("MARKET_DATA_MAX_QUOTA_WAIT", "300")),
+    )
@@ -0,0 +1,145 @@
+from datetime import timezone
+from typing import Iterable
+
+import numpy as np
+
+from market_data.cache import CachedPrice
+from market_data.models import MarketQuote, MarketQuoteBatch
+
+# Quote sources are stored as small codes, indexed into this tuple
+SOURCES = ("unknown", "alpha_vantage", "twelve_data")
+_SOURCE_CODES = {source: code for code, source in enumerate(SOURCES)}
+
+QUOTE_DTYPE = np.dtype(
+    [
+        ("ticker", "<i4"),
+        ("price", "<f8"),
+        ("timestamp", "<M8[ms]"),
+        ("source", "u1"),
+    ]
+)
+
+
+class QuoteSnapshot:
+    """
+    Quotes of a whole universe in one NumPy structured array.
+
+    Row `i` holds `tickers[i]`, and a dict maps each ticker to its row, so a
+    lookup is O(1) and pricing many tickers is a single fancy index. Tickers
+    without a quote have a NaN price; their errors are kept in `errors`.
+    """
+
+    def __init__(self, tickers: Iterable[str]):
+        self.tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        self._rows = {ticker: row for row, ticker in enumerate(self.tickers)}
+        self.quotes = np.zeros(len(self.tickers), dtype=QUOTE_DTYPE)
+        self.quotes["ticker"] = np.arange(len(self.tickers))
+        self.quotes["price"] = np.nan
+        self.quotes["timestamp"] = np.datetime64("NaT")
+        self.errors: dict[str, str] = {}
+
+    @classmethod
+    def from_quotes(cls, quotes: dict[str, MarketQuote]) -> "QuoteSnapshot":
+        snapshot = cls(quotes)
+        snapshot.fill(MarketQuoteBatch(quotes=quotes))
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        row = self._rows.get(ticker.upper())
+        return row is not None and not np.isnan(self.quotes["price"][row])
+
+    @property
+    def nbytes(self) -> int:
+        return self.quotes.nbytes
+
+    def rows(self, tickers: Iterable[str]) -> np.ndarray:
+        """
+        Row of each ticker, -1 for tickers outside the snapshot.
+        """
+        return np.fromiter(
+            (self._rows.get(ticker.upper(), -1) for ticker in tickers), dtype=np.intp
+        )
+
+    def prices(self, tickers: Iterable[str]) -> np.ndarray:
+        """
+        Price of each ticker, NaN where there is none.
+        """
+        rows = self.rows(tickers)
+        prices = np.full(len(rows), np.nan)
+        found = rows >= 0
+        prices[found] = self.quotes["price"][rows[found]]
+        return prices
+
+    def price(self, ticker: str) -> float | None:
+        row = self._rows.get(ticker.upper())
+        if row is None:
+            return None
+        price = float(self.quotes["price"][row])
+        return None if np.isnan(price) else price
+
+    def quote(self, ticker: str) -> MarketQuote | None:
+        price = self.price(ticker)
+        if price is None:
+            return None
+        entry = self.quotes[self._rows[ticker.upper()]]
+        return MarketQuote(
+            ticker=ticker.upper(),
+            price=price,
+            timestamp=entry["timestamp"].item().replace(tzinfo=timezone.utc),
+            source=SOURCES[entry["source"]],
+        )
+
+    def missing(self) -> list[str]:
+        return [
+            self.tickers[row] for row in np.flatnonzero(np.isnan(self.quotes["price"]))
+        ]
+
+    def fill(self, batch: MarketQuoteBatch):
+        """
+        Store the quotes and errors of a batch response.
+        """
+        quotes = [
+            quote for quote in batch.quotes.values() if quote.ticker in self._rows
+        ]
+        self._set(
+            [quote.ticker for quote in quotes],
+            [quote.price for quote in quotes],
+            [quote.timestamp.timestamp() for quote in quotes],
+            [quote.source for quote in quotes],
+        )
+        self.errors.update(batch.errors)
+
+    def fill_cached(self, prices: dict[str, CachedPrice]):
+        """
+        Store price cache entries without building a quote for each.
+        """
+        entries = [(t, entry) for t, entry in prices.items() if t in self._rows]
+        self._set(
+            [ticker for ticker, _ in entries],
+            [entry.price for _, entry in entries],
+            [entry.timestamp for _, entry in entries],
+            [entry.source for _, entry in entries],
+        )
+
+    def _set(
+        self,
+        tickers: list[str],
+        prices: list[float],
+        timestamps: list[float],
+        sources: list[str | None],
+    ):
+        if not tickers:
+            return
+        rows = self.rows(tickers)
+        self.quotes["price"][rows] = prices
+        self.quotes["timestamp"][rows] = (
+            (np.asarray(timestamps) * 1000).astype(np.int64).astype("M8[ms]")
+        )
+        self.quotes["source"][rows] = [
+            _SOURCE_CODES.get(source or "unknown", 0) for source in sources
+        ]
+        for ticker in tickers:
+            self.errors.pop(ticker, None)
@@ -0,0 +1,205 @@
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+METRICS_PATH = Path("data/metrics/ai_investor.prom")
+
+# Seconds; wide enough for both HTTP calls and multi-minute agent runs
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RATIO_BUCKETS = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class MetricSample:
+    name: str
+    labels: dict[str, str]
+    value: float
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Metrics:
+    """
+    In-process counters, gauges and histograms for one session.
+
+    Each series is identified by a metric name and a set of labels, following
+    the Prometheus data model, so the same samples can be written both to
+    SQLite and to a Prometheus text file.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        key = (name, _labels(labels))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str):
+        self._gauges[(name, _labels(labels))] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: tuple[float, ...] | None = None,
+        **labels: str,
+    ):
+        key = (name, _labels(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets or self.buckets)
+        histogram.observe(value)
+
+    def reset(self):
+        self._counters.clear()
+        self._gauges.clear()
+        self._histograms.clear()
+
+    def samples(self) -> list[MetricSample]:
+        """
+        Flatten every series. Histograms expand into cumulative `_bucket`
+        samples plus `_sum` and `_count`, as in the Prometheus exposition format.
+        """
+        samples = [
+            MetricSample(name, dict(labels), value)
+            for (name, labels), value in (self._counters | self._gauges).items()
+        ]
+        for (name, labels), histogram in self._histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                samples.append(
+                    MetricSample(
+                        f"{name}_bucket",
+                        dict(labels) | {"le": f"{bound:g}"},
+                        cumulative,
+                    )
+                )
+            samples.append(
+                MetricSample(
+                    f"{name}_bucket", dict(labels) | {"le": "+Inf"}, histogram.count
+                )
+            )
+            samples.append(MetricSample(f"{name}_sum", dict(labels), histogram.sum))
+            samples.append(MetricSample(f"{name}_count", dict(labels), histogram.count))
+        return samples
+
+    def to_prometheus(self) -> str:
+        kinds = {name: "counter" for name, _ in self._counters}
+        kinds |= {name: "gauge" for name, _ in self._gauges}
+        kinds |= {name: "histogram" for name, _ in self._histograms}
+
+        by_family: dict[str, list[MetricSample]] = {name: [] for name in kinds}
+        for sample in self.samples():
+            by_family[_family(sample.name, kinds)].append(sample)
+
+        lines = []
+        for name in sorted(by_family):
+            lines.append(f"# TYPE {name} {kinds[name]}")
+            for sample in by_family[name]:
+                lines.append(
+                    f"{sample.name}{_format_labels(sample.labels)} "
+                    f"{_format_value(sample.value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path = METRICS_PATH):
+        """
+        Write the text exposition file atomically, for a node_exporter textfile
+        collector or any scraper reading the file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+metrics = Metrics()
+
+
+def http_event_hooks() -> dict[str, list]:
+    """
+    httpx event hooks recording per-endpoint latency and status codes.
+
+    Latency runs until the response headers arrive; the endpoint label is the
+    host and path, without the query string.
+    """
+
+    async def on_request(request: httpx.Request):
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response):
+        request = response.request
+        started = request.extensions.get("metrics_started")
+        if started is None:
+            return
+        endpoint = f"{request.url.host}{request.url.path}"
+        metrics.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - started,
+            endpoint=endpoint,
+        )
+        metrics.inc(
+            "http_requests_total", endpoint=endpoint, status=str(response.status_code)
+        )
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _family(sample_name: str, kinds: dict[str, str]) -> str:
+    if sample_name in kinds:
+        return sample_name
+    for suffix in ("_bucket", "_sum", "_count"):
+        base = sample_name.removesuffix(suffix)
+        if base != sample_name and kinds.get(base) == "histogram":
+            return base
+    return sample_name
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
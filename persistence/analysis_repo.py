@@ -0,0 +1,80 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from ai_agents.decision_agent.schema import InvestmentDecisionOutput
+from ai_agents.fundamental_scout.schema import FundamentalScoutOutput
+from ai_agents.risk_analyst.schema import RiskProfile
+from persistence.database import get_connection
+
+
+@dataclass(frozen=True)
+class StoredAnalysis:
+    ticker: str
+    fingerprint: list[str]
+    fundamental_analysis: FundamentalScoutOutput
+    risk_analysis: RiskProfile
+    investment_decision: InvestmentDecisionOutput
+    portfolio_value: float
+    analyzed_at: datetime
+
+
+class AnalysisRepository:
+    def load(self, ticker: str) -> StoredAnalysis | None:
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT * FROM company_analyses WHERE ticker = ?", (ticker.upper(),)
+        ).fetchone()
+        conn.close()
+
+        if row is None:
+            return None
+
+        return StoredAnalysis(
+            ticker=row["ticker"],
+            fingerprint=json.loads(row["fingerprint"]),
+            fundamental_analysis=FundamentalScoutOutput.model_validate_json(
+                row["fundamental_analysis"]
+            ),
+            risk_analysis=RiskProfile.model_validate_json(row["risk_analysis"]),
+            investment_decision=InvestmentDecisionOutput.model_validate_json(
+                row["investment_decision"]
+            ),
+            portfolio_value=row["portfolio_value"],
+            analyzed_at=datetime.fromisoformat(row["analyzed_at"]),
+        )
+
+    def save(self, analysis: StoredAnalysis):
+        conn = get_connection()
+        conn.execute(
+            """
+            INSERT INTO company_analyses (
+                ticker,
+                fingerprint,
+                fundamental_analysis,
+                risk_analysis,
+                investment_decision,
+                portfolio_value,
+                analyzed_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ticker) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                fundamental_analysis = excluded.fundamental_analysis,
+                risk_analysis = excluded.risk_analysis,
+                investment_decision = excluded.investment_decision,
+                portfolio_value = excluded.portfolio_value,
+                analyzed_at = excluded.analyzed_at
+            """,
+            (
+                analysis.ticker.upper(),
+                json.dumps(analysis.fingerprint),
+                analysis.fundamental_analysis.model_dump_json(),
+                analysis.risk_analysis.model_dump_json(),
+                analysis.investment_decision.model_dump_json(),
+                analysis.portfolio_value,
+                analysis.analyzed_at.isoformat(),
+            ),
+        )
+        conn.commit()
+        conn.close()
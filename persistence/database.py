@@ -3,9 +3,16 @@ from pathlib import Path
 
 DB_PATH = Path("portfolio.db")
 
+# Columns added to a table after it was first created, as
+# (table, column, definition). `CREATE TABLE IF NOT EXISTS` leaves existing
+# tables as they are, so these are added to older databases on startup.
+COLUMN_MIGRATIONS = [
+    ("market_prices", "source", "TEXT"),
+]
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+
+def get_connection(check_same_thread: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -14,5 +21,13 @@ def init_db():
     conn = get_connection()
     with open("persistence/schema.sql") as f:
         conn.executescript(f.read())
+    _add_missing_columns(conn)
     conn.commit()
     conn.close()
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    for table, column, definition in COLUMN_MIGRATIONS:
+        columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
@@ -0,0 +1,29 @@
+import json
+from datetime import datetime, timezone
+
+from observability.metrics import MetricSample
+from persistence.database import get_connection
+
+
+class MetricsRepository:
+    def save_many(self, session_id: str, samples: list[MetricSample]):
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        conn = get_connection()
+        conn.executemany(
+            """
+            INSERT INTO session_metrics (session_id, name, labels, value, recorded_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    session_id,
+                    sample.name,
+                    json.dumps(sample.labels, sort_keys=True),
+                    sample.value,
+                    recorded_at,
+                )
+                for sample in samples
+            ],
+        )
+        conn.commit()
+        conn.close()
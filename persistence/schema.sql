@@ -42,3 +42,121 @@ ON trades (portfolio_id, executed_at);
 
 CREATE INDEX IF NOT EXISTS idx_trades_ticker
 ON trades (ticker);
+
+
+CREATE TABLE IF NOT EXISTS market_prices (
+    ticker TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    source TEXT                      -- Provider that returned the price
+);
+
+
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    limiter TEXT NOT NULL,
+    window TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,        -- Unix time of the last refill
+    PRIMARY KEY (limiter, window)
+);
+
+
+CREATE TABLE IF NOT EXISTS agent_results (
+    cache_key TEXT PRIMARY KEY,      -- sha256 of agent, model, prompt, tools, schema
+    agent TEXT NOT NULL,
+    model TEXT NOT NULL,
+    output TEXT NOT NULL,            -- JSON of the validated output model
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS company_analyses (
+    ticker TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,       -- JSON: signatures of news/overview results
+    fundamental_analysis TEXT NOT NULL,
+    risk_analysis TEXT NOT NULL,
+    investment_decision TEXT NOT NULL,
+    portfolio_value REAL NOT NULL,   -- Portfolio value the risk sizing used
+    analyzed_at TEXT NOT NULL        -- When the fundamental analysis was produced
+);
+
+
+CREATE TABLE IF NOT EXISTS session_runs (
+    session_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,            -- running | completed | failed
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS session_stages (
+    session_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,            -- completed | failed
+    output TEXT,                     -- Checkpointed stage output, set when completed
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, stage),
+    FOREIGN KEY (session_id) REFERENCES session_runs(session_id)
+);
+
+
+CREATE TABLE IF NOT EXISTS session_metrics (
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,            -- JSON object of label names to values
+    value REAL NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_session_metrics_session
+ON session_metrics (session_id, name);
+
+
+CREATE TABLE IF NOT EXISTS search_results (
+    result_id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    page_age TEXT,
+    query TEXT NOT NULL,             -- Query of the last search that returned it
+    company TEXT NOT NULL DEFAULT '',
+    ticker TEXT NOT NULL DEFAULT '',
+    first_seen_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    UNIQUE (url, company)
+);
+
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_results_fts USING fts5(
+    title,
+    description,
+    company,
+    ticker,
+    content = 'search_results',
+    content_rowid = 'result_id',
+    tokenize = 'porter unicode61'
+);
+
+
+CREATE TRIGGER IF NOT EXISTS search_results_ai AFTER INSERT ON search_results BEGIN
+    INSERT INTO search_results_fts (rowid, title, description, company, ticker)
+    VALUES (new.result_id, new.title, new.description, new.company, new.ticker);
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS search_results_ad AFTER DELETE ON search_results BEGIN
+    INSERT INTO search_results_fts
+    (search_results_fts, rowid, title, description, company, ticker)
+    VALUES ('delete', old.result_id, old.title, old.description, old.company, old.ticker);
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS search_results_au AFTER UPDATE ON search_results BEGIN
+    INSERT INTO search_results_fts
+    (search_results_fts, rowid, title, description, company, ticker)
+    VALUES ('delete', old.result_id, old.title, old.description, old.company, old.ticker);
+    INSERT INTO search_results_fts (rowid, title, description, company, ticker)
+    VALUES (new.result_id, new.title, new.description, new.company, new.ticker);
+END;
@@ -0,0 +1,101 @@
+import re
+from datetime import datetime, timezone
+
+from persistence.database import get_connection
+
+
+class SearchArchiveRepository:
+    """
+    Every search result we fetched, tagged with the company and ticker it was
+    searched for and indexed with FTS5.
+    """
+
+    def add_many(
+        self,
+        results: list[dict],
+        query: str,
+        company: str | None = None,
+        ticker: str | None = None,
+    ):
+        now = datetime.now(timezone.utc).isoformat()
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO search_results (
+                    url,
+                    title,
+                    description,
+                    page_age,
+                    query,
+                    company,
+                    ticker,
+                    first_seen_at,
+                    last_seen_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url, company) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    page_age = COALESCE(excluded.page_age, page_age),
+                    query = excluded.query,
+                    ticker = CASE WHEN excluded.ticker != '' THEN excluded.ticker
+                        ELSE ticker END,
+                    last_seen_at = excluded.last_seen_at
+                """,
+                [
+                    (
+                        result["url"],
+                        result.get("title"),
+                        result.get("description"),
+                        result.get("page_age"),
+                        query,
+                        company or "",
+                        (ticker or "").upper(),
+                        now,
+                        now,
+                    )
+                    for result in results
+                    if result.get("url")
+                ],
+            )
+        conn.close()
+
+    def search(
+        self,
+        query: str,
+        ticker: str | None = None,
+        since: datetime | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """
+        Results matching any word of `query`, most relevant first.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+
+        # Quote every term so FTS5 operators in the query are matched literally;
+        # bm25 ranks results matching more of the terms first
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = """
+            SELECT r.url, r.title, r.description, r.page_age, r.company,
+                   r.ticker, r.last_seen_at
+            FROM search_results_fts
+            JOIN search_results r ON r.result_id = search_results_fts.rowid
+            WHERE search_results_fts MATCH ?
+        """
+        params: list = [match]
+        if ticker:
+            sql += " AND r.ticker = ?"
+            params.append(ticker.upper())
+        if since is not None:
+            sql += " AND r.last_seen_at >= ?"
+            params.append(since.astimezone(timezone.utc).isoformat())
+        sql += " ORDER BY bm25(search_results_fts) LIMIT ?"
+        params.append(limit)
+
+        conn = get_connection()
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+from persistence.database import get_connection
+
+
+class SessionRepository:
+    """
+    Checkpoints of session stages, keyed by session id and stage name.
+    """
+
+    def exists(self, session_id: str) -> bool:
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT 1 FROM session_runs WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        conn.close()
+        return row is not None
+
+    def start(self, session_id: str):
+        now = _now()
+        conn = get_connection()
+        conn.execute(
+            """
+            INSERT INTO session_runs (session_id, status, started_at, updated_at)
+            VALUES (?, 'running', ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                status = 'running',
+                updated_at = excluded.updated_at
+            """,
+            (session_id, now, now),
+        )
+        conn.commit()
+        conn.close()
+
+    def finish(self, session_id: str, status: str):
+        conn = get_connection()
+        conn.execute(
+            "UPDATE session_runs SET status = ?, updated_at = ? WHERE session_id = ?",
+            (status, _now(), session_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def completed_stages(self, session_id: str) -> dict[str, str]:
+        """
+        Outputs of the stages that completed, keyed by stage name.
+        """
+        conn = get_connection()
+        rows = conn.execute(
+            """
+            SELECT stage, output FROM session_stages
+            WHERE session_id = ? AND status = 'completed'
+            """,
+            (session_id,),
+        ).fetchall()
+        conn.close()
+        return {row["stage"]: row["output"] for row in rows}
+
+    def save_stage(self, session_id: str, stage: str, output: str):
+        self._write_stage(session_id, stage, "completed", output, None)
+
+    def fail_stage(self, session_id: str, stage: str, error: str):
+        self._write_stage(session_id, stage, "failed", None, error)
+
+    def _write_stage(
+        self,
+        session_id: str,
+        stage: str,
+        status: str,
+        output: str | None,
+        error: str | None,
+    ):
+        conn = get_connection()
+        conn.execute(
+            """
+            INSERT INTO session_stages
+            (session_id, stage, status, output, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id, stage) DO UPDATE SET
+                status = excluded.status,
+                output = excluded.output,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+            """,
+            (session_id, stage, status, output, error, _now()),
+        )
+        conn.commit()
+        conn.close()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -1,4 +1,8 @@
+import numpy as np
+
 from execution.models.portfolio_state import PortfolioState
+from market_data.models import MarketQuote
+from market_data.snapshot import QuoteSnapshot
 from portfolio_calculator.dataclasses import PortfolioMetrics, PositionMetrics
 
 
@@ -6,50 +10,49 @@ class PortfolioCalculator:
     @staticmethod
     def calculate(
         state: PortfolioState,
-        prices: dict[str, float],
+        prices: QuoteSnapshot | dict[str, MarketQuote],
     ) -> PortfolioMetrics:
         """
         Compute derived portfolio metrics from a portfolio state and market prices.
         """
-        position_values: dict[str, float] = {}
-        position_pnls: dict[str, float] = {}
+        if not isinstance(prices, QuoteSnapshot):
+            prices = QuoteSnapshot.from_quotes(prices)
 
-        # --- 1. Compute position market values & unrealized PnL ---
-        for ticker, position in state.positions.items():
-            if ticker not in prices:
-                raise ValueError(f"Missing price for ticker {ticker}")
+        tickers = list(state.positions.keys())
+        positions = list(state.positions.values())
 
-            price = prices[ticker]
-            market_value = position.quantity * price.price
-            unrealized_pnl = (price.price - position.avg_price) * position.quantity
+        # --- 1. Compute position market values & unrealized PnL ---
+        market_prices = prices.prices(tickers)
+        missing = np.isnan(market_prices)
+        if missing.any():
+            raise ValueError(f"Missing price for ticker {tickers[np.argmax(missing)]}")
 
-            position_values[ticker] = market_value
-            position_pnls[ticker] = unrealized_pnl
+        quantities = np.array([p.quantity for p in positions], dtype=np.float64)
+        avg_prices = np.array([p.avg_price for p in positions], dtype=np.float64)
+        position_values = quantities * market_prices
+        position_pnls = (market_prices - avg_prices) * quantities
 
         # --- 2. Compute totals ---
-        positions_value = sum(position_values.values())
-        total_value = state.cash + positions_value
-        total_unrealized_pnl = sum(position_pnls.values())
+        total_value = state.cash + float(position_values.sum())
+        total_unrealized_pnl = float(position_pnls.sum())
 
         if total_value <= 0:
             raise ValueError("Total portfolio value must be positive")
 
         # --- 3. Build PositionMetrics ---
-        positions_metrics: dict[str, PositionMetrics] = {}
-
-        for ticker, position in state.positions.items():
-            market_value = position_values[ticker]
-            allocation_pct = market_value / total_value
-
-            positions_metrics[ticker] = PositionMetrics(
+        allocation_pcts = position_values / total_value
+        positions_metrics: dict[str, PositionMetrics] = {
+            ticker: PositionMetrics(
                 ticker=ticker,
                 quantity=position.quantity,
                 avg_price=position.avg_price,
-                market_price=prices[ticker],
-                market_value=market_value,
-                unrealized_pnl=position_pnls[ticker],
-                allocation_pct=allocation_pct,
+                market_price=float(market_prices[i]),
+                market_value=float(position_values[i]),
+                unrealized_pnl=float(position_pnls[i]),
+                allocation_pct=float(allocation_pcts[i]),
             )
+            for i, (ticker, position) in enumerate(zip(tickers, positions))
+        }
 
         # --- 4. Cash allocation ---
         cash_allocation_pct = state.cash / total_value
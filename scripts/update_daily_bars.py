@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+from market_data.bars import BarStore
+from market_data.composite import create_market_data_provider
+from persistence.database import init_db
+from universe.sp500 import load_sp500_tickers
+
+
+async def main():
+    load_dotenv()
+    init_db()
+
+    provider_name = sys.argv[1] if len(sys.argv) > 1 else "alpha_vantage"
+    provider = create_market_data_provider(provider_name)
+    store = BarStore()
+    tickers = load_sp500_tickers()
+
+    print(f"Updating daily bars for {len(tickers)} tickers from {provider_name}...")
+    errors = await store.update(provider, tickers)
+    await provider.close()
+
+    print(f"Updated {len(tickers) - len(errors)} tickers in {store.root.resolve()}")
+    for ticker, error in errors.items():
+        print(f"- {ticker}: {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from pydantic import ConfigDict, PydanticUserError, TypeAdapter
+
+from observability.metrics import metrics
+from persistence.session_repo import SessionRepository
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Checkpoint(Generic[T]):
+    """
+    How a stage output is written to and read back from its checkpoint.
+    """
+
+    encode: Callable[[T], str]
+    decode: Callable[[str], T]
+
+
+def json_checkpoint(output_type) -> Checkpoint:
+    """
+    Checkpoint any type pydantic can validate: models, dataclasses, TypedDicts,
+    lists and dicts of those, or None.
+    """
+    try:
+        # NaN and infinity, e.g. a signal without bars, are written as JSON
+        # constants; as null they would fail validation on resume
+        adapter = TypeAdapter(
+            output_type, config=ConfigDict(ser_json_inf_nan="constants")
+        )
+    except PydanticUserError:
+        # Models, dataclasses and TypedDicts only take their own config
+        adapter = TypeAdapter(output_type)
+    return Checkpoint(
+        encode=lambda output: adapter.dump_json(output).decode(),
+        decode=adapter.validate_json,
+    )
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...]
+    checkpoint: Checkpoint
+
+
+class SessionDAG:
+    """
+    A session as a graph of stages whose outputs are checkpointed in SQLite.
+
+    A node runs once all its dependencies have an output and receives them as
+    keyword arguments. Independent nodes run concurrently. Running the DAG
+    again under the same session id loads completed stages from their
+    checkpoints and only executes the ones that are missing or failed.
+    """
+
+    def __init__(self, session_id: str, repo: SessionRepository | None = None):
+        self.session_id = session_id
+        self.repo = repo or SessionRepository()
+        self._nodes: dict[str, Node] = {}
+        self._completed: dict[str, str] = {}
+        self.resumed: list[str] = []
+
+    def add(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Any]],
+        deps: tuple[str, ...] = (),
+        checkpoint: Checkpoint | None = None,
+    ):
+        if name in self._nodes:
+            raise ValueError(f"Duplicate stage {name}")
+        self._nodes[name] = Node(
+            name=name,
+            run=run,
+            deps=tuple(deps),
+            checkpoint=checkpoint or json_checkpoint(None),
+        )
+
+    def is_completed(self, name: str) -> bool:
+        """
+        Whether a stage or step has a checkpoint from an earlier run.
+        """
+        return name in self._completed
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Run every stage not completed yet and return all stage outputs.
+        """
+        self.repo.start(self.session_id)
+        self._completed = self.repo.completed_stages(self.session_id)
+
+        outputs: dict[str, Any] = {}
+        pending = dict(self._nodes)
+        try:
+            while pending:
+                ready = [
+                    node
+                    for node in pending.values()
+                    if all(dep in outputs for dep in node.deps)
+                ]
+                if not ready:
+                    raise ValueError(
+                        f"Unresolvable stage dependencies: {sorted(pending)}"
+                    )
+
+                results = await asyncio.gather(
+                    *(
+                        self._run_node(node, {dep: outputs[dep] for dep in node.deps})
+                        for node in ready
+                    ),
+                    return_exceptions=True,
+                )
+                for node, result in zip(ready, results):
+                    if isinstance(result, BaseException):
+                        raise result
+                    outputs[node.name] = result
+                    del pending[node.name]
+        except BaseException:
+            self.repo.finish(self.session_id, "failed")
+            raise
+
+        self.repo.finish(self.session_id, "completed")
+        return outputs
+
+    async def step(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[T]],
+        checkpoint: Checkpoint[T],
+    ) -> T:
+        """
+        Checkpoint a unit of work discovered while a stage runs, such as one
+        company pipeline. It is skipped when resuming if it already completed.
+        """
+        if name in self._completed:
+            self.resumed.append(name)
+            return checkpoint.decode(self._completed[name])
+
+        started = time.perf_counter()
+        try:
+            output = await fn()
+        except Exception as e:
+            self.repo.fail_stage(self.session_id, name, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            metrics.observe(
+                "session_stage_duration_seconds",
+                time.perf_counter() - started,
+                stage=name,
+            )
+
+        self.repo.save_stage(self.session_id, name, checkpoint.encode(output))
+        return output
+
+    async def _run_node(self, node: Node, inputs: dict[str, Any]):
+        return await self.step(
+            node.name, lambda: node.run(**inputs), checkpoint=node.checkpoint
+        )
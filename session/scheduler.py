@@ -0,0 +1,104 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+from ai_agents.opportunity_scout.schema import OpportunityCandidate
+
+T = TypeVar("T")
+
+Stage = Callable[[str, Awaitable[T]], Awaitable[T]]
+
+
+async def unscheduled_stage(name: str, awaitable: Awaitable[T]) -> T:
+    """
+    Stage runner used outside a scheduler: no deadline.
+    """
+    return await awaitable
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    workers: int = 2
+    stage_timeout: float = 300.0
+    stage_timeouts: dict[str, float] = field(default_factory=dict)
+    deadline: float | None = None
+
+
+@dataclass
+class PipelineOutcome:
+    candidate: OpportunityCandidate
+    result: Any = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class PipelineScheduler:
+    """
+    Run company pipelines on a bounded pool of workers.
+
+    Candidates start in order of priority and confidence. Every stage of a
+    pipeline gets its own deadline, a failing pipeline only loses its own
+    result, and once the session deadline passes the stragglers are cancelled
+    so allocation can go on with whatever finished. Each outcome records
+    whether its pipeline finished, failed or never ran.
+    """
+
+    def __init__(self, config: SchedulerConfig | None = None):
+        self.config = config or SchedulerConfig()
+
+    async def stage(self, name: str, awaitable: Awaitable[T]) -> T:
+        timeout = self.config.stage_timeouts.get(name, self.config.stage_timeout)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Stage {name} exceeded {timeout:g}s") from None
+
+    async def run(
+        self,
+        candidates: list[OpportunityCandidate],
+        pipeline: Callable[[OpportunityCandidate, Stage], Awaitable[Any]],
+    ) -> list[PipelineOutcome]:
+        """
+        Run `pipeline(candidate, stage)` for every candidate.
+
+        Returns one outcome per candidate, in scheduling order.
+        """
+        ordered = sorted(candidates, key=lambda c: c.rank, reverse=True)
+        outcomes = [PipelineOutcome(candidate=candidate) for candidate in ordered]
+        queue: asyncio.Queue[PipelineOutcome] = asyncio.Queue()
+        for outcome in outcomes:
+            queue.put_nowait(outcome)
+
+        async def worker():
+            while not queue.empty():
+                outcome = queue.get_nowait()
+                started = time.monotonic()
+                try:
+                    outcome.result = await pipeline(outcome.candidate, self.stage)
+                except asyncio.CancelledError:
+                    outcome.error = "cancelled at session deadline"
+                    raise
+                except Exception as e:
+                    outcome.error = f"{type(e).__name__}: {e}"
+                finally:
+                    outcome.elapsed = time.monotonic() - started
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.config.workers, len(ordered)))
+        ]
+        if workers:
+            _, pending = await asyncio.wait(workers, timeout=self.config.deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for outcome in outcomes:
+            if outcome.result is None and outcome.error is None:
+                outcome.error = "not started before session deadline"
+        return outcomes
@@ -0,0 +1,38 @@
+import math
+
+from session.dag import json_checkpoint
+from universe.prescreen import ScreenedTicker
+
+
+def test_json_checkpoint_round_trips_missing_signals():
+    checkpoint = json_checkpoint(list[ScreenedTicker])
+    screened = [
+        ScreenedTicker(
+            ticker="AAPL",
+            company="Apple Inc.",
+            sector="Information Technology",
+            score=0.5,
+            signals={
+                "momentum": math.nan,
+                "volatility": math.inf,
+                "volume_zscore": -math.inf,
+                "gap": 0.01,
+                "news_count": 0.0,
+            },
+        )
+    ]
+
+    restored = checkpoint.decode(checkpoint.encode(screened))
+
+    signals = restored[0].signals
+    assert math.isnan(signals["momentum"])
+    assert signals["volatility"] == math.inf
+    assert signals["volume_zscore"] == -math.inf
+    assert signals["gap"] == 0.01
+    assert restored[0].score == 0.5
+
+
+def test_json_checkpoint_round_trips_nan_float():
+    checkpoint = json_checkpoint(float)
+
+    assert math.isnan(checkpoint.decode(checkpoint.encode(math.nan)))
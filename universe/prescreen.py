@@ -0,0 +1,171 @@
+import json
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ai_agents.tools.cache import tool_cache
+from market_data.bars import BarStore
+from market_data.indicators import IndicatorEngine, IndicatorMatrix
+
+
+@dataclass(frozen=True)
+class PreScreenConfig:
+    top_n: int = 60
+    # Calendar days of bars loaded for the indicators: the rolling windows
+    # plus a few months for the ATR to settle
+    history_days: int = 180
+    weights: dict[str, float] = field(
+        default_factory=lambda: {
+            "momentum": 1.0,
+            "volatility": 0.5,
+            "volume_zscore": 1.0,
+            "gap": 0.75,
+            "news_count": 1.0,
+        }
+    )
+
+
+@dataclass(frozen=True)
+class ScreenedTicker:
+    ticker: str
+    company: str
+    sector: str
+    score: float
+    signals: dict[str, float]
+    # False when there was nothing to rank on and the ticker was passed through
+    ranked: bool = True
+
+    def summary(self) -> str:
+        """
+        One-line rendering of the key numbers for an agent prompt.
+        """
+        s = self.signals
+        return (
+            f"{self.ticker} ({self.company}, {self.sector}): "
+            f"mom {_pct(s['momentum'])}, vol {_pct(s['volatility'])}, "
+            f"volume z {_num(s['volume_zscore'])}, gap {_pct(s['gap'])}, "
+            f"news {int(s['news_count'])}"
+        )
+
+
+def universe_indicators(
+    tickers: list[str], store: BarStore | None = None, start: date | None = None
+) -> IndicatorMatrix:
+    """
+    Compute the latest indicator matrix for the universe from the bar store,
+    from the bars since `start` when given.
+    """
+    store = store or BarStore()
+    panel = store.load_panel(tickers, start=start)
+    return IndicatorEngine(panel).compute()
+
+
+async def prescreen_universe(
+    universe: pd.DataFrame,
+    indicators: IndicatorMatrix,
+    config: PreScreenConfig | None = None,
+) -> list[ScreenedTicker]:
+    """
+    Rank the universe by cheap local signals and keep the top N.
+
+    Each signal is turned into a cross-sectional percentile rank (missing
+    values rank last, tied values share their average rank) and the weighted
+    sum of ranks is the score. Equal scores are ordered by ticker so the
+    result is deterministic. Without bars or cached news for any ticker there
+    is nothing to rank on, and the whole universe is passed through unranked.
+    """
+    config = config or PreScreenConfig()
+    tickers = universe["ticker"].tolist()
+    columns = {ticker: i for i, ticker in enumerate(indicators.tickers)}
+    rows = np.array([columns.get(ticker, -1) for ticker in tickers])
+
+    def aligned(name: str) -> np.ndarray:
+        values = np.full(len(tickers), np.nan)
+        known = rows >= 0
+        values[known] = indicators[name][rows[known]]
+        return values
+
+    news = await tool_cache.peek_many(
+        "get_latest_news",
+        [{"company_name": company} for company in universe["company"]],
+    )
+    signals = {
+        "momentum": aligned("momentum"),
+        "volatility": aligned("volatility"),
+        "volume_zscore": aligned("volume_zscore"),
+        "gap": aligned("gap"),
+        "news_count": np.array([_count_results(result) for result in news], float),
+    }
+
+    known = np.zeros(len(tickers), dtype=bool)
+    for name in ("momentum", "volatility", "volume_zscore", "gap"):
+        known |= ~np.isnan(signals[name])
+    known |= np.array([result is not None for result in news])
+    if not known.any():
+        return [
+            ScreenedTicker(
+                ticker=tickers[i],
+                company=universe["company"].iloc[i],
+                sector=universe["sector"].iloc[i],
+                score=0.0,
+                signals={name: float(values[i]) for name, values in signals.items()},
+                ranked=False,
+            )
+            for i in range(len(tickers))
+        ]
+
+    # Attention cuts both ways: large moves down rank as high as moves up
+    ranked = {
+        "momentum": np.abs(signals["momentum"]),
+        "volatility": signals["volatility"],
+        "volume_zscore": signals["volume_zscore"],
+        "gap": np.abs(signals["gap"]),
+        "news_count": signals["news_count"],
+    }
+    scores = np.zeros(len(tickers))
+    for name, weight in config.weights.items():
+        scores += weight * _percentile_rank(ranked[name])
+
+    order = sorted(range(len(tickers)), key=lambda i: (-scores[i], tickers[i]))
+    return [
+        ScreenedTicker(
+            ticker=tickers[i],
+            company=universe["company"].iloc[i],
+            sector=universe["sector"].iloc[i],
+            score=float(scores[i]),
+            signals={name: float(values[i]) for name, values in signals.items()},
+        )
+        for i in order[: config.top_n]
+    ]
+
+
+def _percentile_rank(values: np.ndarray) -> np.ndarray:
+    ranks = np.zeros(len(values))
+    known = ~np.isnan(values)
+    if known.sum() > 1:
+        _, inverse, counts = np.unique(
+            values[known], return_inverse=True, return_counts=True
+        )
+        # Tied values get the mean of the positions they span
+        first = np.cumsum(counts) - counts
+        ranks[known] = (first + (counts - 1) / 2)[inverse] / (known.sum() - 1)
+    return ranks
+
+
+def _count_results(result: str | None) -> int:
+    if result is None:
+        return 0
+    try:
+        return len(json.loads(result))
+    except (json.JSONDecodeError, TypeError):
+        return 0
+
+
+def _pct(value: float) -> str:
+    return "n/a" if np.isnan(value) else f"{value:+.1%}"
+
+
+def _num(value: float) -> str:
+    return "n/a" if np.isnan(value) else f"{value:+.1f}"